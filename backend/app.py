@@ -1,40 +1,42 @@
 import os
 import re
-import pytesseract
-import fitz
 import random
+import threading
+import time
+from startup import StartupProfile, LazyService, BackgroundLoader
+startup_profile = StartupProfile()
 from datetime import datetime, timedelta # Updated import
-from PIL import Image
 # 💡 REQUIRED IMPORTS FOR PDF GENERATION AND FLASK RESPONSE
-from flask import Flask, request, jsonify, make_response 
+from flask import Flask, Blueprint, request, jsonify, make_response, Response, stream_with_context, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from pymongo import MongoClient
+from backends import create_mongo_client, create_llm_client as create_backend_llm_client
 from bson import ObjectId, json_util 
-from openai import OpenAI 
-from openai import APIError # 💡 ADDED for specific LLM error handling
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from flask import send_file
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from io import BytesIO
+from llm_jobs import LLMJobQueue, LLM_PENDING, STATUS_PENDING, build_llm_prompt
+from llm_backfill import LLMBackfillService
+from ocr_jobs import OCRJobManager, JOB_DONE, JOB_FAILED
+from ocr_cache import OCRResultCache
+from pdf_renderer import ReportPDFRenderer, PDFCache, PDF_BACKENDS, build_report_sections
+from pdf_bulk import BulkPDFExporter
+from model_registry import ModelRegistry
+from model_bundle import BundleError, LATEST_FILE, MANIFEST_FILE, list_bundles, load_bundle, read_latest
+from symptom_matcher import FEATURE_NAMES, SYNONYM_MAP, SymptomMatcher, lexicon_paths_from_env
+import tracing
+from tracing import SamplingProfiler, stage
+from io import BytesIO, StringIO
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+import csv
+import json
 import datetime
 import ast
 from bson.errors import InvalidId # 💡 ADDED for MongoDB ID error handling
+from pymongo.errors import BulkWriteError
 
-# PDF Generation Library
-from weasyprint import HTML 
-
-# --- ML Imports ---
-import joblib
-import pandas as pd
-import numpy as np
+# --- ML Imports --- (joblib / xgboost / numpy are imported by the background model load)
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
+startup_profile.mark("imports")
 
 # --- Rule-Based Logic (Unchanged) ---
 SYMPTOM_DISEASE_MAP = {
@@ -44,40 +46,134 @@ SYMPTOM_DISEASE_MAP = {
 }
 
 # ---------------- Flask Setup ----------------
-app = Flask(__name__)
-CORS(app)
+# Routes live on a blueprint; create_app() (bottom of file) builds the Flask app and starts background loads
+api = Blueprint("api", __name__)
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "pdf"}
 STATIC_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "static")
 os.makedirs(STATIC_DIR, exist_ok=True) # Ensure static directory exists for PDF logo
 
+# ---------------- Tracing / Metrics ----------------
+# Every request is a trace named after its endpoint; `with stage(...)` blocks feed the
+# per-stage histograms served at /metrics and the Server-Timing response header.
+# PROFILE_SLOW_MS turns on the sampling profiler: requests slower than that leave a
+# folded-stack file in PROFILE_DIR (flamegraph.pl / speedscope).
+PROFILE_SLOW_MS = os.getenv("PROFILE_SLOW_MS")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+profiler = None
+if PROFILE_SLOW_MS:
+    profiler = SamplingProfiler(
+        slow_seconds=float(PROFILE_SLOW_MS) / 1000,
+        interval=PROFILE_INTERVAL_MS / 1000,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        output_dir=PROFILE_DIR,
+        keep=PROFILE_KEEP
+    )
+    print(f"💡 Slow-request profiler on: > {PROFILE_SLOW_MS} ms, profiles in {PROFILE_DIR}/")
+
+@api.before_app_request
+def start_trace():
+    tracing.begin(request.endpoint or "unmatched")
+    g.profile_token = profiler.start() if profiler is not None else None
+
+@api.after_app_request
+def finish_trace(response):
+    active = tracing.end()
+    if active is None:
+        return response
+    seconds = tracing.observe_request(active, request.method, response.status_code)
+    if active.stages:
+        response.headers["Server-Timing"] = active.server_timing()
+    if profiler is not None:
+        profiler.stop(g.pop("profile_token", None), active.endpoint, seconds)
+    return response
+
+@api.teardown_app_request
+def abandon_trace(error=None):
+    # An unhandled exception skips after_app_request; still count the request and free the profiler slot
+    active = tracing.end()
+    if active is not None:
+        seconds = tracing.observe_request(active, request.method, 500)
+        if profiler is not None:
+            profiler.stop(g.pop("profile_token", None), active.endpoint, seconds)
+
+@api.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text exposition format
+    return Response(tracing.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
 # ---------------- MongoDB ----------------
-MONGO_URI = "mongodb://localhost:27017"
-client = MongoClient(MONGO_URI)
+# MONGO_BACKEND=mongomock runs on an in-process store (see backends.py)
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_BACKEND = os.getenv("MONGO_BACKEND", "mongo")
+client = create_mongo_client(MONGO_BACKEND, MONGO_URI)
 db = client["zoonotic_ai"]
 users_collection = db["users"]
 reports_collection = db["reports"]
-
-# Indexes
-reports_collection.create_index("disease")
-reports_collection.create_index("created_at")
-reports_collection.create_index("user_id")
+job_state_collection = db["job_state"]
+upload_jobs_collection = db["upload_jobs"]
+
+# Indexes (created in the background by create_app; MongoClient itself connects lazily)
+def ensure_indexes():
+    reports_collection.create_index("disease")
+    reports_collection.create_index("created_at")
+    reports_collection.create_index("user_id")
+    # Keyset pagination on (created_at, _id): per patient and across all patients
+    reports_collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+    reports_collection.create_index([("created_at", -1), ("_id", -1)])
+    # Finished upload jobs only need to be pollable for a day
+    upload_jobs_collection.create_index("created_at", expireAfterSeconds=86400)
+    return True
+
+index_loader = BackgroundLoader("mongo_indexes", ensure_indexes, startup_profile)
 
 # ---------------- OpenAI Setup ----------------
 openai_api_key = os.getenv("OPENAI_API_KEY", "YOUR_API_KEY_HERE")
-llm_client = OpenAI(api_key=openai_api_key)
+# LLM_BACKEND=fake answers with a canned suggestion after FAKE_LLM_LATENCY_MS (see backends.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+def create_llm_client():
+    return create_backend_llm_client(LLM_BACKEND, openai_api_key)
+
+# Built on the first LLM job, not at import
+llm_client = LazyService(LLM_BACKEND, create_llm_client, startup_profile)
+
+# The fake backend needs no key; the background backfill only starts when LLM calls can succeed
+LLM_CONFIGURED = LLM_BACKEND != "openai" or openai_api_key not in ("", "YOUR_API_KEY_HERE")
 
 # 💡 CORRECTION: Add an explicit check for the placeholder key
-if openai_api_key == "YOUR_API_KEY_HERE":
+if not LLM_CONFIGURED:
     print("\n" + "="*80)
     print("FATAL ERROR: OPENAI_API_KEY is not set.")
     print("Please set the environment variable or replace 'YOUR_API_KEY_HERE' in app.py.")
     print("LLM suggestions will fail until this is fixed.")
     print("="*80 + "\n")
 
+# 💡 LLM suggestions are generated off the request path on a bounded worker pool
+llm_jobs = LLMJobQueue(
+    llm_client,
+    reports_collection,
+    max_workers=int(os.getenv("LLM_WORKERS", "4")),
+    timeout=float(os.getenv("LLM_TIMEOUT", "20")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+    retry_after=float(os.getenv("LLM_RETRY_AFTER", "300")),
+)
+
+# 💡 Missing suggestions ("N/A") are backfilled by a separate rate-limited service, never by GET /reports
+llm_backfill = LLMBackfillService(
+    reports_collection,
+    job_state_collection,
+    llm_jobs,
+    batch_size=int(os.getenv("LLM_BACKFILL_BATCH_SIZE", "20")),
+    rate_per_minute=float(os.getenv("LLM_BACKFILL_RATE_PER_MIN", "30")),
+    interval=float(os.getenv("LLM_BACKFILL_INTERVAL", "30")),
+    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "5")),
+)
+LLM_BACKFILL_ENABLED = os.getenv("LLM_BACKFILL_ENABLED", "1") == "1" and LLM_CONFIGURED
+
 
 # ---------------- Helpers ----------------
 def allowed_file(filename):
@@ -138,34 +234,61 @@ def dynamic_suggestions(disease, risk_level, symptoms, risk_prob=0.2):
     ]
     return {"AI Suggestion": selected, "Reasoning": reasoning, "Risk Level": risk_level, "Risk Probability": risk_prob}
 
+def prepare_report(report_entry):
+    user_id = report_entry.get("user_id")
+    if user_id and isinstance(user_id, str) and user_id != "guest":
+        try:
+            # Store as ObjectId if valid, otherwise keep string (e.g., "guest" or an invalid ID string)
+            report_entry["user_id"] = ObjectId(user_id)
+        except InvalidId:
+            # 💡 IMPROVEMENT: Catch specific error but still keep original string if it's not a valid ObjectId
+            pass 
+    
+    suggestion = report_entry.get("suggestion")
+    if isinstance(suggestion, dict):
+        report_entry["suggestion_full"] = suggestion
+        report_entry["risk_level"] = suggestion.get("Risk Level")
+        report_entry["risk_probability"] = suggestion.get("Risk Probability")
+        report_entry["suggestion_summary"] = (
+            f"Risk: {suggestion.get('Risk Level', 'N/A')} "
+            f"({suggestion.get('Risk Probability', 0) * 100:.1f}%). "
+            f"Advice: {', '.join(suggestion.get('AI Suggestion', []))}"
+        )
+        del report_entry["suggestion"]
+    return report_entry
+
 def save_report(report_entry):
     try:
-        user_id = report_entry.get("user_id")
-        if user_id and isinstance(user_id, str) and user_id != "guest":
-            try:
-                # Store as ObjectId if valid, otherwise keep string (e.g., "guest" or an invalid ID string)
-                report_entry["user_id"] = ObjectId(user_id)
-            except InvalidId:
-                # 💡 IMPROVEMENT: Catch specific error but still keep original string if it's not a valid ObjectId
-                pass 
-        
-        suggestion = report_entry.get("suggestion")
-        if isinstance(suggestion, dict):
-            report_entry["suggestion_full"] = suggestion
-            report_entry["risk_level"] = suggestion.get("Risk Level")
-            report_entry["risk_probability"] = suggestion.get("Risk Probability")
-            report_entry["suggestion_summary"] = (
-                f"Risk: {suggestion.get('Risk Level', 'N/A')} "
-                f"({suggestion.get('Risk Probability', 0) * 100:.1f}%). "
-                f"Advice: {', '.join(suggestion.get('AI Suggestion', []))}"
-            )
-            del report_entry["suggestion"]
-
+        prepare_report(report_entry)
         result = reports_collection.insert_one(report_entry.copy())
         return str(result.inserted_id)
     except Exception as e:
         raise RuntimeError(f"Failed to save report: {str(e)}")
 
+def save_reports(report_entries):
+    # 💡 Bulk variant of save_report: one insert_many round trip for a whole batch
+    # Returns one (inserted_id, None) or (None, error message) pair per entry
+    if not report_entries:
+        return []
+    docs = [prepare_report(entry).copy() for entry in report_entries]
+    try:
+        result = reports_collection.insert_many(docs, ordered=False)
+        return [(str(_id), None) for _id in result.inserted_ids]
+    except BulkWriteError as e:
+        # ordered=False: every document without a write error was inserted (insert_many set its _id)
+        errors = {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+        print(f"⚠️ Batch save: {e.details.get('nInserted', 0)} inserted, {len(errors)} failed")
+        return [
+            (None, f"Failed to save report: {errors[i]}") if i in errors else (str(doc["_id"]), None)
+            for i, doc in enumerate(docs)
+        ]
+    except Exception as e:
+        raise RuntimeError(f"Failed to save reports: {str(e)}")
+
+# Left out of list views (both still available via /download_report): the OCR text, and
+# suggestion_full, which list views rebuild as "suggestion" from suggestion_summary
+REPORT_LIST_EXCLUDE = {"raw_text": 0, "suggestion_full": 0}
+
 def serialize_report(report):
     report_copy = report.copy()
     report_copy["_id"] = str(report_copy["_id"])
@@ -190,25 +313,9 @@ def serialize_report(report):
     return report_copy
 
 # ---------------- Load ML Models ----------------
-FEATURE_NAMES = [
-    "anxiety", "bite", "muscle pain", "saliva", "hallucination", 
-    "seizure", "respiratory distress", "rash", "paralysis", "headache", 
-    "bleeding", "hydrophobia", "cold", "fever", "joint pain", 
-    "encephalitis", "agitation", "animal contact", "nausea", 
-    "confusion", "cough", "vomiting"
-]
-
-SYNONYM_MAP = {
-    "bodyache": "muscle pain", "muscle ache": "muscle pain",
-    "fear of water": "hydrophobia",
-    "breathing": "respiratory distress", "breathing issue": "respiratory distress",
-    "respiratory": "respiratory distress",
-    "dog": "animal contact", "animal": "animal contact",
-    "scratch": "bite", "bite wound": "bite",
-    "pain": "joint pain", "body pain": "joint pain",
-    "chills": "fever", "temperature": "fever",
-    "sore throat": "cough", "throat pain": "cough"
-}
+# Feature order and synonyms live in symptom_matcher.py (shared with inference.py); free text is
+# mapped to features by a phrase matcher compiled once from them plus lexicons/*.json (SYMPTOM_LEXICONS)
+symptom_matcher = SymptomMatcher(FEATURE_NAMES, SYNONYM_MAP, lexicon_paths_from_env())
 
 # Simple symptom-to-general-disease mapping (used in fallback)
 SINGLE_SYMPTOM_FALLBACK = {
@@ -224,18 +331,165 @@ SINGLE_SYMPTOM_FALLBACK = {
 }
 
 
-xgb_model = None
-label_encoder = None
+# Versioned model bundles (see model_bundle.py); the pickles are only a fallback when none exists
+MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR", "models")
+
+# Memoized predictions: LRU entries per loaded model version (0 disables), plus an optional
+# table of the PREDICTION_PRECOMPUTE_TOP most frequent symptom combinations built at load time
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_PRECOMPUTE_TOP = int(os.getenv("PREDICTION_PRECOMPUTE_TOP", "0"))
+PREDICTION_PRECOMPUTE_SCAN = int(os.getenv("PREDICTION_PRECOMPUTE_SCAN", "50000"))
+
+def frequent_symptom_sets(limit):
+    # Most common matched_symptoms among the latest ML reports
+    pipeline = [
+        {"$match": {"source": {"$in": ["ml-symptoms-structured", "ml-symptoms-batch"]}}},
+        {"$sort": {"_id": -1}},
+        {"$limit": PREDICTION_PRECOMPUTE_SCAN},
+        {"$group": {"_id": "$matched_symptoms", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit}
+    ]
+    return [doc["_id"] for doc in reports_collection.aggregate(pipeline) if isinstance(doc["_id"], list)]
+
+def warm_prediction_table(engine):
+    if PREDICTION_PRECOMPUTE_TOP <= 0:
+        return engine
+    try:
+        count = engine.precompute(frequent_symptom_sets(PREDICTION_PRECOMPUTE_TOP))
+        print(f"✅ Precomputed {count} frequent symptom combinations for model {engine.version}.")
+    except Exception as e:
+        # Only a warm-up: the LRU still fills on demand
+        print(f"⚠️ Warning: could not precompute frequent symptom combinations - {e}")
+    return engine
+
+def load_legacy_inference_engine():
+    import joblib
+    from inference_engine import SymptomInferenceEngine
 
-try:
     xgb_model = joblib.load("xgboost_disease_model.pkl")
     label_encoder = joblib.load("label_encoder.pkl")
-    print("✅ XGBoost + LabelEncoder loaded successfully.")
-except Exception as e:
-    print(f"⚠️ Warning: Could not load ML models - {e}. Symptom prediction will fail.")
+    engine = SymptomInferenceEngine(xgb_model, label_encoder.classes_, FEATURE_NAMES, version="legacy-pickle",
+                                    cache_size=PREDICTION_CACHE_SIZE)
+    print("⚠️ Loaded legacy XGBoost pickles; export a bundle with model_bundle.py --from-pickle.")
+    return warm_prediction_table(engine)
+
+def load_inference_engine(version=None):
+    from inference_engine import SymptomInferenceEngine
+
+    has_bundle = any(os.path.isfile(os.path.join(MODEL_BUNDLE_DIR, f)) for f in (LATEST_FILE, MANIFEST_FILE))
+    if version is None and not has_bundle:
+        return load_legacy_inference_engine()
+
+    # Checksum / shape errors raise: a corrupt bundle must not silently fall back to the pickles
+    bundle = load_bundle(MODEL_BUNDLE_DIR, version)
+    # 💡 Precompile the pandas-free inference path once the model is loaded
+    # Each engine gets its own prediction cache, so a reload never serves another version's outputs
+    engine = SymptomInferenceEngine.from_bundle(bundle, cache_size=PREDICTION_CACHE_SIZE)
+    print(f"✅ XGBoost model bundle {bundle.version} loaded successfully.")
+    return warm_prediction_table(engine)
+
+def latest_model_version():
+    return read_latest(MODEL_BUNDLE_DIR)
+
+# Several versions can be loaded at once: one active, plus an optional A/B candidate
+model_registry = ModelRegistry(
+    load_inference_engine,
+    latest_version=latest_model_version,
+    max_loaded=int(os.getenv("MODEL_MAX_LOADED", "4")),
+    log_every=int(os.getenv("MODEL_STATS_LOG_EVERY", "500"))
+)
+
+def load_models():
+    # MODEL_VERSION pins a version; otherwise follow models/LATEST and re-activate when it changes
+    pinned_version = os.getenv("MODEL_VERSION") or None
+    model_registry.activate(pinned_version)
+    candidate = os.getenv("MODEL_CANDIDATE")
+    if candidate:
+        model_registry.set_candidate(candidate, float(os.getenv("MODEL_CANDIDATE_SHARE", "0.1")))
+    if pinned_version is None:
+        model_registry.start_watcher(float(os.getenv("MODEL_WATCH_INTERVAL", "10")))
+    return model_registry
+
+# Loaded on a background thread; prediction routes wait up to MODEL_READY_TIMEOUT for it
+model_loader = BackgroundLoader("model", load_models, startup_profile)
+MODEL_READY_TIMEOUT = float(os.getenv("MODEL_READY_TIMEOUT", "5"))
+
+# Placeholder user ids shared by every anonymous client (the frontend sends "test_user" when
+# nobody is logged in); sticky A/B routing on them would put all anonymous traffic in one bucket
+ANONYMOUS_USER_IDS = {"guest", "test_user"}
+
+def get_inference_engine(routing_key=None):
+    # Engine serving this request: the active model, or the A/B candidate for its share of users
+    registry = model_loader.wait(MODEL_READY_TIMEOUT)
+    if str(routing_key) in ANONYMOUS_USER_IDS:
+        routing_key = None  # routed per request at random
+    return registry.choose(routing_key) if registry is not None else None
+
+def model_unavailable():
+    if model_loader.error is not None:
+        return jsonify({"error": "ML model not loaded. Check server logs."}), 500
+    response = jsonify({"error": "ML model is still loading. Retry shortly."})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+# ---------------- Free-text NER (optional) ----------------
+# mode="ner" on /predict_symptoms runs a BioBERT-style NER model over free text. It is enabled by
+# pointing NER_MODEL_PATH at a local model directory (no downloads at runtime); see ner_service.py
+NER_MODEL_PATH = os.getenv("NER_MODEL_PATH")
+NER_TIMEOUT = float(os.getenv("NER_TIMEOUT", "10"))
+NER_ENTITY_GROUPS = {g.strip().lower() for g in os.getenv("NER_ENTITY_GROUPS", "sign_symptom,disease_disorder").split(",") if g.strip()}
+
+def load_ner_service():
+    from ner_service import NERService, load_ner_pipeline
+
+    ner_pipeline = load_ner_pipeline(NER_MODEL_PATH, os.getenv("NER_BACKEND", "torch"),
+                                     int(os.getenv("NER_THREADS", "0")) or None)
+    print(f"✅ NER model loaded from {NER_MODEL_PATH}.")
+    return NERService(
+        ner_pipeline,
+        max_batch=int(os.getenv("NER_MAX_BATCH", "16")),
+        max_wait_ms=float(os.getenv("NER_MAX_WAIT_MS", "10")),
+        cache_size=int(os.getenv("NER_CACHE_SIZE", "2048"))
+    ).start()
+
+ner_loader = BackgroundLoader("ner", load_ner_service, startup_profile) if NER_MODEL_PATH else None
+
+def extract_free_text_symptoms(text):
+    # Returns (normalized_symptoms, None) or (None, error response)
+    if ner_loader is None:
+        return None, (jsonify({"error": "Free-text NER mode is not enabled on this server."}), 400)
+    if not isinstance(text, str) or not text.strip():
+        return None, (jsonify({"error": "text must be a non-empty string"}), 400)
+    ner_service = ner_loader.wait(MODEL_READY_TIMEOUT)
+    if ner_service is None:
+        if ner_loader.error is not None:
+            return None, (jsonify({"error": "NER model not loaded. Check server logs."}), 500)
+        response = jsonify({"error": "NER model is still loading. Retry shortly."})
+        response.headers["Retry-After"] = "2"
+        return None, (response, 503)
+    try:
+        entities = ner_service.extract(text, NER_TIMEOUT)
+    except FuturesTimeoutError:
+        return None, (jsonify({"error": "NER extraction timed out."}), 504)
+    except Exception as e:
+        print(f"⚠️ NER Extraction Error: {e}")
+        return None, (jsonify({"error": "Failed to run NER extraction."}), 500)
+    spans = [e["word"] for e in entities if not NER_ENTITY_GROUPS or str(e["entity_group"]).lower() in NER_ENTITY_GROUPS]
+    # NER spans go through the phrase matcher too; phrases it knows in the full text are kept as well
+    normalized = symptom_matcher.match(text) + symptom_matcher.normalize([s.lower() for s in spans])
+    return list(dict.fromkeys(normalized)), None
+
+def parse_symptoms(symptoms_raw):
+    # Returns the cleaned, lower-cased symptom list, or None if the payload has the wrong type
+    if isinstance(symptoms_raw, str):
+        return [s.strip().lower() for s in symptoms_raw.split(",") if s.strip()]
+    if isinstance(symptoms_raw, list):
+        return [s.strip().lower() for s in symptoms_raw if isinstance(s, str) and s.strip()]
+    return None
 
 # ---------------- Auth Routes ----------------
-@app.route("/register", methods=["POST"])
+@api.route("/register", methods=["POST"])
 def register():
     data = request.json
     username = data.get("username")
@@ -259,7 +513,7 @@ def register():
     users_collection.insert_one({"username": username, "password": hashed_pw, "role": role})
     return jsonify({"success": True, "message": "User registered successfully"})
 
-@app.route("/login", methods=["POST"])
+@api.route("/login", methods=["POST"])
 def login():
     data = request.json
     username = data.get("username")
@@ -279,9 +533,65 @@ def login():
         })
     return jsonify({"success": False, "message": "Invalid username, password, or role"}), 401
 
-# ---------------- File Upload / OCR (Unchanged logic, see original code for lines 257-313) ----------------
-# ... (File Upload / OCR code is unchanged, retained below) ...
-@app.route("/upload", methods=["POST"])
+# ---------------- File Upload / OCR ----------------
+def complete_upload_job(job_doc, parsed):
+    # Runs in the API process once the OCR pool has extracted and parsed the file
+    disease = parsed["disease"]
+    result = parsed["result"]
+    ct_values = parsed["ct_values"]
+    risk_level = parsed["risk_level"]
+    user_id = job_doc["user_id"]
+
+    suggestion = dynamic_suggestions(
+        disease=disease,
+        risk_level=risk_level,
+        symptoms=[],
+        risk_prob=1.0
+    )
+    
+    llm_suggestion = "N/A" # LLM is not typically run for OCR results unless triggered later
+
+    report_entry = {
+        "user_id": user_id,
+        "disease": disease,
+        "result": result,
+        "ct_values": ct_values if ct_values else "N/A",
+        "ct_value": ", ".join([f"{g}: {v}" for g, v in ct_values.items()]) if ct_values else "N/A",
+        "suggestion": suggestion,
+        "llm_suggestion": llm_suggestion,
+        "raw_text": parsed["text"],
+        "created_at": datetime.datetime.utcnow(),
+        "source": "upload"
+    }
+
+    inserted_id = save_report(report_entry)
+    
+    return {
+        "disease": disease,
+        "matched_symptoms": [],
+        "suggestion": suggestion,
+        "_id": inserted_id,
+        "user_id": user_id,
+        "result": result,
+        "ct_values": ct_values,
+        "risk_level": risk_level
+    }
+
+# 💡 OCR + parsing run in a process pool; /upload only enqueues and returns a job id
+# Re-uploads of identical bytes reuse the cached extraction (memory LRU, optionally backed by Mongo)
+ocr_cache = OCRResultCache(
+    max_entries=int(os.getenv("OCR_CACHE_SIZE", "256")),
+    collection=db["ocr_cache"] if os.getenv("OCR_CACHE_PERSIST", "0") == "1" else None
+)
+
+ocr_jobs = OCRJobManager(
+    upload_jobs_collection,
+    complete_upload_job,
+    max_workers=int(os.getenv("OCR_WORKERS", "0")) or None,
+    cache=ocr_cache
+)
+
+@api.route("/upload", methods=["POST"])
 def upload_file():
     user_id = request.form.get("user_id")
     if not user_id: 
@@ -297,108 +607,78 @@ def upload_file():
         return jsonify({"error": "Invalid file type"}), 400
 
     filename = secure_filename(file.filename)
-    file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
 
     try:
-        file.save(file_path)
-        
-        text = ""
-        if filename.lower().endswith(".pdf"):
-            with fitz.open(file_path) as doc:
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text += page.get_text()
-        else:
-            config = r"--oem 3 --psm 6"
-            text = pytesseract.image_to_string(Image.open(file_path), config=config)
-
-        disease_match = re.search(r"(Dengue|Nipah|Rabies|Zoonotic)", text, re.IGNORECASE)
-        result_match = re.search(r"Overall result:\s*(Positive|Negative|Detected|Not Detected)", text, re.IGNORECASE)
-
-        ct_values = {}
-        matches_format1 = re.findall(r"([A-Za-z0-9]+ gene).?\(Ct\s*=?\s*([\d.]+)\)", text, re.IGNORECASE)
-        matches_format2 = re.findall(r"(NS1 gene|E gene|N gene|G gene)\s+(Detected|Positive|Negative)\s*([\d.]+)?", text, re.IGNORECASE)
-
-        for gene, value in matches_format1:
-            ct_values[gene.strip()] = value
-        for gene, _, value in matches_format2:
-            if value: ct_values[gene.strip()] = value
-
-        disease = disease_match.group(1) if disease_match else "Unknown"
-        result = result_match.group(1) if result_match else "Unknown"
-
-        def ct_to_risk(ct_vals):
-            numeric_cts = [float(v) for v in ct_vals.values() if v and re.match(r"^\d+\.?\d*$", v)]
-            if not numeric_cts: return "Unknown"
-            min_ct = min(numeric_cts)
-            if min_ct < 20: return "High"
-            if min_ct <= 30: return "Moderate"
-            return "Low"
-
-        risk_level = ct_to_risk(ct_values)
-
-        suggestion = dynamic_suggestions(
-            disease=disease,
-            risk_level=risk_level,
-            symptoms=[],
-            risk_prob=1.0
-        )
-        
-        llm_suggestion = "N/A" # LLM is not typically run for OCR results unless triggered later
-
-        report_entry = {
-            "user_id": user_id,
-            "disease": disease,
-            "result": result,
-            "ct_values": ct_values if ct_values else "N/A",
-            "ct_value": ", ".join([f"{g}: {v}" for g, v in ct_values.items()]) if ct_values else "N/A",
-            "suggestion": suggestion,
-            "llm_suggestion": llm_suggestion,
-            "raw_text": text,
-            "created_at": datetime.datetime.utcnow(),
-            "source": "upload"
-        }
-
-        inserted_id = save_report(report_entry)
-        
-        return jsonify({
-            "disease": disease,
-            "matched_symptoms": [],
-            "suggestion": suggestion,
-            "_id": inserted_id,
-            "user_id": user_id,
-            "result": result,
-            "ct_values": ct_values,
-            "risk_level": risk_level
-        })
-
+        # Processed from memory: no shared uploads/ path, so same-named concurrent uploads cannot collide
+        with stage("read_file"):
+            content = file.read()
+        job = ocr_jobs.submit(content, filename, user_id)
     except Exception as e:
         print(f"❌ Upload failed: {str(e)}") 
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    response = {
+        "job_id": job["_id"],
+        "status": job["status"],
+        "status_url": f"/upload/status/{job['_id']}"
+    }
+    if job["status"] == JOB_DONE:
+        response["result"] = job["result"]
+        return jsonify(response), 200
+    if job["status"] == JOB_FAILED:
+        response["error"] = job.get("error", "Upload processing failed.")
+        return jsonify(response), 500
+    return jsonify(response), 202
+
+@api.route("/admin/ocr_cache", methods=["GET"])
+def ocr_cache_stats():
+    return jsonify(ocr_cache.stats())
+
+@api.route("/admin/ocr_cache", methods=["DELETE"])
+def ocr_cache_clear():
+    ocr_cache.clear()
+    return jsonify({"success": True, **ocr_cache.stats()})
+
+@api.route("/upload/status/<job_id>", methods=["GET"])
+def upload_status(job_id):
+    job = ocr_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Upload job not found"}), 404
+
+    response = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == JOB_DONE:
+        response["result"] = job.get("result")
+    elif job["status"] == JOB_FAILED:
+        response["error"] = job.get("error", "Upload processing failed.")
+    return jsonify(response)
 
 # ---------------- Predict Symptoms ----------------
-@app.route("/predict_symptoms", methods=["POST"])
+@api.route("/predict_symptoms", methods=["POST"])
 def predict_symptoms():
-    if xgb_model is None or label_encoder is None:
-        return jsonify({"error": "ML model not loaded. Check server logs."}), 500
-
     data = request.get_json()
     user_id = data.get("user_id") 
+
+    inference_engine = get_inference_engine(user_id)
+    if inference_engine is None:
+        return model_unavailable()
     symptoms_raw = data.get("symptoms", "")
-    
-    if isinstance(symptoms_raw, str):
-        input_symptoms = [s.strip().lower() for s in symptoms_raw.split(",") if s.strip()]
-    elif isinstance(symptoms_raw, list):
-        input_symptoms = [s.strip().lower() for s in symptoms_raw if s.strip()]
+
+    if data.get("mode") == "ner":
+        # Free-text mode: {"mode": "ner", "text": "..."} (or the text in "symptoms")
+        text = data.get("text", symptoms_raw)
+        with stage("ner"):
+            normalized_symptoms, error_response = extract_free_text_symptoms(text)
+        if error_response is not None:
+            return error_response
+        input_symptoms = [text.strip()]
     else:
-        return jsonify({"error": "Symptoms must be a string or list"}), 400
+        input_symptoms = parse_symptoms(symptoms_raw)
+        if input_symptoms is None:
+            return jsonify({"error": "Symptoms must be a string or list"}), 400
 
-    # Normalize using your synonyms
-    normalized_symptoms = [SYNONYM_MAP.get(s, s) for s in input_symptoms]
+        # Normalize with the phrase matcher: synonyms and multi-word phrases inside free text
+        with stage("normalize"):
+            normalized_symptoms = symptom_matcher.normalize(input_symptoms)
 
     # --- Single symptom fallback ---
     if len(normalized_symptoms) == 1 and normalized_symptoms[0] in SINGLE_SYMPTOM_FALLBACK:
@@ -429,7 +709,8 @@ def predict_symptoms():
             "source": "fallback-single-symptom"
         }
 
-        inserted_id = save_report(report_entry)
+        with stage("save_report"):
+            inserted_id = save_report(report_entry)
 
         return jsonify({
             "disease": disease,
@@ -443,55 +724,30 @@ def predict_symptoms():
         })
 
     # --- ML Prediction for multiple symptoms ---
-    feature_vector = [1 if f in normalized_symptoms else 0 for f in FEATURE_NAMES]
-    X = pd.DataFrame([feature_vector], columns=FEATURE_NAMES)
-
     try:
-        proba = xgb_model.predict_proba(X)[0]
-        prediction_enc = np.argmax(proba)
-        disease = label_encoder.inverse_transform([prediction_enc])[0]
-        confidence = round(float(np.max(proba)) * 100, 2)
+        started = time.perf_counter()
+        with stage("model"):
+            disease, confidence, matched_symptoms = inference_engine.predict_one(normalized_symptoms)
+        model_registry.record(inference_engine.version, time.perf_counter() - started, [disease])
     except Exception as e:
         print(f"⚠️ XGBoost Prediction Error: {e}")
         return jsonify({"error": "Failed to run ML prediction."}), 500
 
     risk_level = map_confidence_to_risk(confidence)
-    matched_symptoms = [s for s in normalized_symptoms if s in FEATURE_NAMES and X.iloc[0][s] == 1]
 
     if confidence < 10: 
         disease = "Common Illness/Non-Zoonotic"
 
-    suggestion_object = dynamic_suggestions(
-        disease=disease, 
-        risk_level=risk_level, 
-        symptoms=matched_symptoms, 
-        risk_prob=(confidence / 100)
-    )
-
-    # ✅ LLM suggestion
-    try:
-        prompt = f"""
-        You are an AI medical assistant specialized in zoonotic diseases.
-        Patient shows symptoms: {', '.join(matched_symptoms) if matched_symptoms else 'No major symptoms reported'}.
-        Detected disease: {disease}.
-        Risk level: {risk_level}.
-        Confidence: {confidence}%.
-        Provide 3 safe and helpful health suggestions (avoid medication or prescriptions).
-        """
-        llm_response = llm_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=200
+    with stage("suggestions"):
+        suggestion_object = dynamic_suggestions(
+            disease=disease, 
+            risk_level=risk_level, 
+            symptoms=matched_symptoms, 
+            risk_prob=(confidence / 100)
         )
-        llm_suggestion = llm_response.choices[0].message.content.strip()
-    except APIError as e: # 💡 CORRECTION: Catch specific API error and log it
-        print(f"❌ LLM API Error (predict_symptoms): OpenAI API call failed with error: {e}") 
-        llm_suggestion = "LLM suggestion unavailable due to API error."
-    except Exception as e:
-        print(f"❌ LLM General Error (predict_symptoms): {e}") 
-        llm_suggestion = "LLM suggestion unavailable due to a general error."
 
+    # ✅ LLM suggestion is filled in by a background job once the report is saved
+    llm_suggestion = LLM_PENDING
 
     report_entry = {
         "user_id": user_id,
@@ -502,11 +758,16 @@ def predict_symptoms():
         "confidence": confidence,
         "suggestion": suggestion_object,
         "llm_suggestion": llm_suggestion,
+        "llm_status": STATUS_PENDING,
+        "model_version": inference_engine.version,
         "created_at": datetime.datetime.utcnow(),
         "source": "ml-symptoms-structured"
     }
 
-    inserted_id = save_report(report_entry)
+    with stage("save_report"):
+        inserted_id = save_report(report_entry)
+    with stage("llm_submit"):
+        llm_jobs.submit(inserted_id, build_llm_prompt(matched_symptoms, disease, risk_level, confidence))
 
     return jsonify({
         "disease": disease,
@@ -514,78 +775,277 @@ def predict_symptoms():
         "matched_symptoms": matched_symptoms,
         "suggestion": suggestion_object,
         "llm_suggestion": llm_suggestion,
+        "llm_status": STATUS_PENDING,
+        "model_version": inference_engine.version,
         "result": f"ML Risk: {risk_level}",
         "_id": inserted_id,
         "user_id": user_id
     })
 
 
+# ---------------- Batch Predict Symptoms ----------------
+MAX_BATCH_SIZE = 1000
+
+@api.route("/predict_symptoms/batch", methods=["POST"])
+def predict_symptoms_batch():
+    data = request.get_json(silent=True) or {}
+    cases = data.get("cases")
+    default_user_id = data.get("user_id")
+
+    # One model per batch, routed like a single request from default_user_id
+    inference_engine = get_inference_engine(default_user_id)
+    if inference_engine is None:
+        return model_unavailable()
+
+    if not isinstance(cases, list) or not cases:
+        return jsonify({"error": "cases must be a non-empty list"}), 400
+    if len(cases) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch too large. Maximum is {MAX_BATCH_SIZE} cases."}), 400
+
+    results = [None] * len(cases)
+    report_entries = []
+    entry_positions = []
+    ml_cases = []  # (position, user_id, input_symptoms, normalized_symptoms)
+    llm_prompts = {}  # position -> prompt for the background LLM job
+
+    for pos, case in enumerate(cases):
+        if not isinstance(case, dict):
+            results[pos] = {"error": "Each case must be an object"}
+            continue
+        user_id = case.get("user_id", default_user_id)
+        input_symptoms = parse_symptoms(case.get("symptoms", ""))
+        if input_symptoms is None:
+            results[pos] = {"error": "Symptoms must be a string or list"}
+            continue
+        with stage("normalize"):
+            normalized_symptoms = symptom_matcher.normalize(input_symptoms)
+
+        # --- Single symptom fallback (no model call needed) ---
+        if len(normalized_symptoms) == 1 and normalized_symptoms[0] in SINGLE_SYMPTOM_FALLBACK:
+            disease = SINGLE_SYMPTOM_FALLBACK[normalized_symptoms[0]]
+            confidence = 90
+            risk_level = "Low"
+            suggestion_object = dynamic_suggestions(
+                disease=disease,
+                risk_level=risk_level,
+                symptoms=normalized_symptoms,
+                risk_prob=confidence/100
+            )
+            llm_suggestion = f"Based on the single symptom '{normalized_symptoms[0]}', it is likely a {disease}. Monitor symptoms and consult a doctor if they worsen. Stay well-hydrated and rest."
+            results[pos] = {
+                "disease": disease,
+                "confidence": confidence,
+                "matched_symptoms": normalized_symptoms,
+                "suggestion": suggestion_object,
+                "llm_suggestion": llm_suggestion,
+                "result": f"ML Risk: {risk_level}",
+                "user_id": user_id
+            }
+            report_entries.append({
+                "user_id": user_id,
+                "disease": disease,
+                "result": f"ML Risk: {risk_level}",
+                "symptoms_reported": ", ".join(input_symptoms),
+                "matched_symptoms": normalized_symptoms,
+                "confidence": confidence,
+                "suggestion": suggestion_object,
+                "llm_suggestion": llm_suggestion,
+                "created_at": datetime.datetime.utcnow(),
+                "source": "fallback-single-symptom"
+            })
+            entry_positions.append(pos)
+            continue
+
+        ml_cases.append((pos, user_id, input_symptoms, normalized_symptoms))
+
+    # --- Vectorized ML prediction: one feature matrix, one predict_proba call ---
+    if ml_cases:
+        try:
+            started = time.perf_counter()
+            with stage("model"):
+                predictions = inference_engine.predict_many([case[3] for case in ml_cases])
+            model_registry.record(inference_engine.version, time.perf_counter() - started, [p[0] for p in predictions])
+        except Exception as e:
+            print(f"⚠️ XGBoost Batch Prediction Error: {e}")
+            return jsonify({"error": "Failed to run ML prediction."}), 500
+
+        for (pos, user_id, input_symptoms, _), (disease, confidence, matched_symptoms) in zip(ml_cases, predictions):
+            risk_level = map_confidence_to_risk(confidence)
+
+            if confidence < 10:
+                disease = "Common Illness/Non-Zoonotic"
+
+            suggestion_object = dynamic_suggestions(
+                disease=disease,
+                risk_level=risk_level,
+                symptoms=matched_symptoms,
+                risk_prob=(confidence / 100)
+            )
+
+            llm_suggestion = LLM_PENDING
+            llm_prompts[pos] = build_llm_prompt(matched_symptoms, disease, risk_level, confidence)
+
+            results[pos] = {
+                "disease": disease,
+                "confidence": confidence,
+                "matched_symptoms": matched_symptoms,
+                "suggestion": suggestion_object,
+                "llm_suggestion": llm_suggestion,
+                "llm_status": STATUS_PENDING,
+                "model_version": inference_engine.version,
+                "result": f"ML Risk: {risk_level}",
+                "user_id": user_id
+            }
+            report_entries.append({
+                "user_id": user_id,
+                "disease": disease,
+                "result": f"ML Risk: {risk_level}",
+                "symptoms_reported": ", ".join(input_symptoms),
+                "matched_symptoms": matched_symptoms,
+                "confidence": confidence,
+                "suggestion": suggestion_object,
+                "llm_suggestion": llm_suggestion,
+                "llm_status": STATUS_PENDING,
+                "model_version": inference_engine.version,
+                "created_at": datetime.datetime.utcnow(),
+                "source": "ml-symptoms-batch"
+            })
+            entry_positions.append(pos)
+
+    # --- Bulk insert all reports in one round trip ---
+    try:
+        with stage("save_report"):
+            saved_reports = save_reports(report_entries)
+    except RuntimeError as e:
+        print(f"❌ Batch save failed: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    saved = 0
+    with stage("llm_submit"):
+        for pos, (inserted_id, error) in zip(entry_positions, saved_reports):
+            if error is not None:
+                results[pos] = {"error": error}
+                continue
+            saved += 1
+            results[pos]["_id"] = inserted_id
+            if pos in llm_prompts:
+                llm_jobs.submit(inserted_id, llm_prompts[pos])
+
+    return jsonify({"count": saved, "failed": len(saved_reports) - saved, "results": results})
+
+
 # ---------------- Fetch Reports ----------------
-@app.route("/reports", methods=["GET"])
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Fields that may be requested via ?fields=; "suggestion" expands to the stored summary fields
+LISTABLE_FIELDS = {
+    "user_id", "disease", "result", "confidence", "matched_symptoms", "symptoms_reported",
+    "ct_values", "ct_value", "llm_suggestion", "llm_status", "source", "created_at",
+    "risk_level", "risk_probability", "suggestion_summary", "raw_text", "suggestion_full"
+}
+SUGGESTION_FIELDS = ("suggestion_summary", "risk_level", "risk_probability")
+
+def encode_report_cursor(report):
+    created_ms = int(report["created_at"].replace(tzinfo=datetime.timezone.utc).timestamp() * 1000)
+    return f"{created_ms}_{report['_id']}"
+
+def decode_report_cursor(cursor):
+    created_ms, _, oid = cursor.partition("_")
+    try:
+        created_at = datetime.datetime.fromtimestamp(int(created_ms) / 1000, tz=datetime.timezone.utc).replace(tzinfo=None)
+    except (OverflowError, OSError) as e:
+        # Out-of-range timestamps surface as a bad cursor (400), not a 500
+        raise ValueError(f"cursor timestamp out of range: {e}")
+    return created_at, ObjectId(oid)
+
+def keyset_filter(cursor):
+    # Strictly "older than" the cursor in (created_at desc, _id desc) order
+    created_at, oid = decode_report_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": oid}}
+    ]}
+
+def build_report_projection(fields_param):
+    # Returns (projection, requested field names or None)
+    if not fields_param:
+        return dict(REPORT_LIST_EXCLUDE), None
+    requested = [f.strip() for f in fields_param.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LISTABLE_FIELDS and f != "suggestion"]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    projection = {"_id": 1, "created_at": 1, "user_id": 1}
+    for f in requested:
+        for stored in (SUGGESTION_FIELDS if f == "suggestion" else (f,)):
+            projection[stored] = 1
+    return projection, set(requested) | {"_id", "created_at", "user_id"}
+
+def serialize_list_report(report, requested):
+    r_serial = serialize_report(report)
+    if requested is None:
+        return r_serial
+    return {k: v for k, v in r_serial.items() if k in requested}
+
+@api.route("/reports", methods=["GET"])
 def get_reports():
     role = request.args.get("role", "user")
     user_id_param = request.args.get("user_id")
+    cursor_param = request.args.get("cursor")
 
     try:
-        # Define the process to backfill/check LLM suggestion
-        def backfill_llm_suggestion(r_serial):
-            if r_serial.get("llm_suggestion") == "N/A":
-                try:
-                    prompt = f"""
-                    You are an AI medical assistant specialized in zoonotic diseases.
-                    Patient shows symptoms: {', '.join(r_serial.get('matched_symptoms', []))}.
-                    Detected disease: {r_serial.get('disease')}.
-                    Risk level: {r_serial.get('risk_level')}.
-                    Confidence: {r_serial.get('confidence', 0)}%.
-                    Provide 3 safe and helpful health suggestions (avoid medication or prescriptions).
-                    """
-                    llm_response = llm_client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.7,
-                        max_tokens=200
-                    )
-                    llm_suggestion = llm_response.choices[0].message.content.strip()
-                    r_serial["llm_suggestion"] = llm_suggestion
-                    # Update the report in MongoDB
-                    reports_collection.update_one(
-                        {"_id": ObjectId(r_serial["_id"])},
-                        {"$set": {"llm_suggestion": llm_suggestion}}
-                    )
-                except APIError as e: # 💡 CORRECTION: Catch specific API error and log it
-                    print(f"❌ LLM API Error (reports backfill): OpenAI API call failed with error: {e}") 
-                    r_serial["llm_suggestion"] = "LLM suggestion unavailable due to API error."
-                except Exception as e:
-                    print(f"❌ LLM General Error (reports backfill): {e}") 
-                    r_serial["llm_suggestion"] = "LLM suggestion unavailable due to a general error."
-            return r_serial
-        
-        # Doctor role logic
-        if role == "doctor":
-            user_ids_with_reports = reports_collection.distinct("user_id")
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        projection, requested = build_report_projection(request.args.get("fields"))
+        page_filter = keyset_filter(cursor_param) if cursor_param else {}
+    except (ValueError, InvalidId) as e:
+        return jsonify({"error": f"Invalid pagination parameters. {e}"}), 400
+
+    try:
+        # Doctor role logic: one aggregation pages reports newest-first, groups them per user and joins the username
+        if role == "doctor" and not user_id_param:
+            pipeline = [
+                {"$match": page_filter},
+                {"$sort": {"created_at": -1, "_id": -1}},
+                {"$limit": limit + 1},
+                {"$project": projection},
+                {"$group": {
+                    "_id": "$user_id",
+                    "latest": {"$first": "$created_at"},
+                    "reports": {"$push": "$$ROOT"}
+                }},
+                {"$sort": {"latest": -1}},
+                {"$lookup": {
+                    "from": users_collection.name,
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "user"
+                }},
+                {"$project": {"reports": 1, "username": {"$arrayElemAt": ["$user.username", 0]}}}
+            ]
+            groups = list(reports_collection.aggregate(pipeline, allowDiskUse=True))
+
+            # One extra report was fetched to detect another page; drop the oldest one
+            next_cursor = None
+            page_reports = [r for g in groups for r in g["reports"]]
+            if len(page_reports) > limit:
+                oldest = min(page_reports, key=lambda r: (r["created_at"], r["_id"]))
+                for g in groups:
+                    g["reports"] = [r for r in g["reports"] if r["_id"] != oldest["_id"]]
+                groups = [g for g in groups if g["reports"]]
+                page_reports.remove(oldest)
+                last = min(page_reports, key=lambda r: (r["created_at"], r["_id"]))
+                next_cursor = encode_report_cursor(last)
+
             users_list = []
-            for uid in user_ids_with_reports:
+            for group in groups:
+                uid = group["_id"]
                 str_uid = str(uid) if isinstance(uid, ObjectId) else uid
-                user_doc = None
-                if isinstance(uid, ObjectId):
-                    user_doc = users_collection.find_one({"_id": uid})
-                elif uid != "guest":
-                    try:
-                        user_doc = users_collection.find_one({"_id": ObjectId(uid)})
-                    except InvalidId:
-                        pass
-                
-                username = user_doc["username"] if user_doc else ("Guest User" if uid == "guest" else f"User {str_uid}")
-                reports_cursor = reports_collection.find({"user_id": uid}).sort("created_at", -1)
-                reports = []
-                for r in reports_cursor:
-                    r_serial = serialize_report(r)
-                    r_serial = backfill_llm_suggestion(r_serial) # Backfill attempt
-                    reports.append(r_serial)
+                username = group.get("username") or ("Guest User" if uid == "guest" else f"User {str_uid}")
+                reports = [serialize_list_report(r, requested) for r in group["reports"]]
                 users_list.append({"user_id": str_uid, "username": username, "reports": reports})
-            return jsonify(users_list)
+            return jsonify({"users": users_list, "next_cursor": next_cursor})
         
-        # User role logic
+        # User role logic (also used by doctors to page through a single patient)
         else:
             if not user_id_param:
                 return jsonify({"error": "Missing user_id"}), 400
@@ -595,21 +1055,179 @@ def get_reports():
                     query_options.append(ObjectId(user_id_param))
                 except InvalidId:
                     pass
-                
-            reports_cursor = reports_collection.find({"user_id": {"$in": query_options}}).sort("created_at", -1)
-            reports = []
-            for r in reports_cursor:
-                r_serial = serialize_report(r)
-                r_serial = backfill_llm_suggestion(r_serial) # Backfill attempt
-                reports.append(r_serial)
-            return jsonify(reports)
+
+            query = {"user_id": {"$in": query_options}, **page_filter}
+            reports_cursor = (
+                reports_collection.find(query, projection)
+                .sort([("created_at", -1), ("_id", -1)])
+                .limit(limit + 1)
+            )
+            page = list(reports_cursor)
+            next_cursor = encode_report_cursor(page[limit - 1]) if len(page) > limit else None
+            reports = [serialize_list_report(r, requested) for r in page[:limit]]
+            return jsonify({"reports": reports, "next_cursor": next_cursor})
             
     except Exception as e:
         print(f"Error fetching reports: {e}")
         return jsonify({"error": "Failed to fetch reports. " + str(e)}), 500
 
+# ---------------- Streaming Export (NDJSON / CSV) ----------------
+EXPORT_BATCH_SIZE = 500
+EXPORT_CSV_COLUMNS = [
+    "_id", "user_id", "created_at", "disease", "result", "confidence", "risk_level",
+    "risk_probability", "matched_symptoms", "symptoms_reported", "ct_value", "source", "llm_status"
+]
+
+def parse_export_date(value, end_of_day=False):
+    parsed = datetime.datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        # A bare YYYY-MM-DD end date includes that whole day
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+def export_json_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
+
+def export_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return "; ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+@api.route("/reports/export", methods=["GET"])
+def export_reports():
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    query = {}
+    try:
+        created_range = {}
+        if request.args.get("start"):
+            created_range["$gte"] = parse_export_date(request.args["start"])
+        if request.args.get("end"):
+            created_range["$lt"] = parse_export_date(request.args["end"], end_of_day=True)
+        if created_range:
+            query["created_at"] = created_range
+        batch_size = min(max(int(request.args.get("batch_size", EXPORT_BATCH_SIZE)), 1), 5000)
+        projection, requested = build_report_projection(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid export parameters. {e}"}), 400
+
+    diseases = [d.strip() for d in request.args.get("disease", "").split(",") if d.strip()]
+    if diseases:
+        query["disease"] = {"$in": diseases}
+
+    # "suggestion" is stored flattened; export the stored fields rather than the rebuilt dict
+    if requested is not None:
+        columns = [c for c in projection if projection[c]]
+    else:
+        columns = EXPORT_CSV_COLUMNS
+
+    def generate():
+        cursor = reports_collection.find(query, projection).sort("created_at", 1).batch_size(batch_size)
+        try:
+            if export_format == "csv":
+                buffer = StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                for doc in cursor:
+                    writer.writerow([export_value(doc.get(c, "")) for c in columns])
+                    # Flush every ~64 KB so memory stays flat regardless of export size
+                    if buffer.tell() > 64 * 1024:
+                        yield buffer.getvalue()
+                        buffer.seek(0)
+                        buffer.truncate(0)
+                yield buffer.getvalue()
+            else:
+                for doc in cursor:
+                    yield json.dumps(doc, default=export_json_default) + "\n"
+        finally:
+            cursor.close()
+
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=reports_{stamp}.{export_format}"}
+    )
+
+# ---------------- LLM Suggestion Status (poll / SSE) ----------------
+def _llm_suggestion_state(report_id):
+    report_doc = reports_collection.find_one(
+        {"_id": ObjectId(report_id)},
+        {"llm_suggestion": 1, "llm_status": 1}
+    )
+    if not report_doc:
+        return None
+    llm_suggestion = report_doc.get("llm_suggestion", "N/A")
+    status = report_doc.get("llm_status") or (STATUS_PENDING if llm_suggestion == LLM_PENDING else "done")
+    return {"_id": report_id, "llm_status": status, "llm_suggestion": llm_suggestion}
+
+@api.route("/reports/<report_id>/llm_suggestion", methods=["GET"])
+def get_llm_suggestion(report_id):
+    try:
+        state = _llm_suggestion_state(report_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid report id"}), 400
+    if state is None:
+        return jsonify({"error": "Report not found"}), 404
+    return jsonify(state)
+
+@api.route("/reports/<report_id>/llm_suggestion/stream", methods=["GET"])
+def stream_llm_suggestion(report_id):
+    try:
+        state = _llm_suggestion_state(report_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid report id"}), 400
+    if state is None:
+        return jsonify({"error": "Report not found"}), 404
+
+    max_wait = float(os.getenv("LLM_STREAM_TIMEOUT", "60"))
+
+    def events(state):
+        deadline = time.monotonic() + max_wait
+        yield f"event: status\ndata: {json_util.dumps(state)}\n\n"
+        while state["llm_status"] == STATUS_PENDING and time.monotonic() < deadline:
+            # Wake as soon as an in-process job finishes; fall back to polling for jobs owned by other workers
+            llm_jobs.wait(report_id, timeout=1.0)
+            state = _llm_suggestion_state(report_id)
+            if state is None:
+                return
+            if state["llm_status"] != STATUS_PENDING:
+                yield f"event: status\ndata: {json_util.dumps(state)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(events(state)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ---------------- LLM Backfill Admin ----------------
+@api.route("/admin/llm_backfill", methods=["GET"])
+def llm_backfill_status():
+    return jsonify(llm_backfill.status())
+
+@api.route("/admin/llm_backfill/run", methods=["POST"])
+def llm_backfill_run():
+    # Queues one pass on the backfill thread; progress shows up in GET /admin/llm_backfill
+    if not LLM_CONFIGURED:
+        return jsonify({"success": False, "error": "OPENAI_API_KEY is not set"}), 409
+    llm_backfill.trigger()
+    return jsonify({"success": True, "queued": True, **llm_backfill.status()}), 202
+
 # ---------------- Report Deletion (User-Specific) ----------------
-@app.route("/reports", methods=["DELETE"])
+@api.route("/reports", methods=["DELETE"])
 def delete_reports_by_user():
     user_id = request.args.get("user_id")
 
@@ -637,7 +1255,7 @@ def delete_reports_by_user():
         return jsonify({"success": False, "error": str(e)}), 500
 
 # ---------------- Clear All Reports for Doctor ----------------
-@app.route("/doctor/clear_all_reports", methods=["DELETE"])
+@api.route("/doctor/clear_all_reports", methods=["DELETE"])
 def doctor_clear_all_reports():
     try:
         result = reports_collection.delete_many({})
@@ -649,7 +1267,7 @@ def doctor_clear_all_reports():
         return jsonify({"success": False, "error": str(e)}), 500
         
 # ---------------- Global Data Clear Route ----------------
-@app.route("/admin/clear_all_data", methods=["DELETE"])
+@api.route("/admin/clear_all_data", methods=["DELETE"])
 def clear_all_reports_global():
     try:
         result = reports_collection.delete_many({})
@@ -664,133 +1282,35 @@ def clear_all_reports_global():
 
 
 # ---------------- Report Download (JSON or PDF) ----------------
-@app.route('/download_report/<report_id>', methods=['GET'])
+# Template, stylesheet and logo are prepared once; rendered PDFs are cached per report version
+PDF_RENDERER = os.getenv("PDF_RENDERER", "weasyprint")  # or "reportlab"
+pdf_cache = PDFCache(
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    cache_dir=os.getenv("PDF_CACHE_DIR") or None,
+    max_disk_bytes=int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+) if os.getenv("PDF_CACHE_ENABLED", "1") == "1" else None
+pdf_renderers = {name: ReportPDFRenderer(STATIC_DIR, cache=pdf_cache, backend=name) for name in PDF_BACKENDS}
+pdf_renderer = pdf_renderers[PDF_RENDERER]
+
+
+@api.route('/download_report/<report_id>', methods=['GET'])
 def download_report(report_id):
     try:
         # 🧠 Fetch report by ID
-        report_doc = reports_collection.find_one({'_id': ObjectId(report_id)})
+        with stage("fetch"):
+            report_doc = reports_collection.find_one({'_id': ObjectId(report_id)})
         if not report_doc:
             return jsonify({"error": "Report not found"}), 404
-        
-        report = serialize_report(report_doc)
 
-        # 💡 Handle suggestions & advice
-        llm_suggestion_text = report.get('llm_suggestion', 'No AI advice available.')
-        suggestion_data = report.get('suggestion', {})
-        ai_suggestion_list = []
+        # ?renderer=weasyprint|reportlab overrides the PDF_RENDERER default
+        renderer = pdf_renderers.get(request.args.get("renderer", PDF_RENDERER))
+        if renderer is None:
+            return jsonify({"error": f"renderer must be one of {', '.join(PDF_BACKENDS)}"}), 400
 
-        if isinstance(suggestion_data, dict) and 'AI Suggestion' in suggestion_data:
-            ai_suggestion_list = suggestion_data['AI Suggestion']
-            if not isinstance(ai_suggestion_list, list):
-                ai_suggestion_list = [str(ai_suggestion_list)]
-        else:
-            summary = report.get('suggestion_summary', 'No model-based suggestion available.')
-            if "Advice: " in summary:
-                advice_part = summary.split("Advice: ", 1)[-1]
-                ai_suggestion_list = [s.strip() for s in advice_part.split(',') if s.strip()]
-            else:
-                ai_suggestion_list = [summary]
-
-        # 🧩 Prepare logo
-        logo_path_rel = "static/logo.png"
-        logo_path_abs = os.path.join(os.path.abspath(os.path.dirname(__file__)), logo_path_rel)
-        # logo_path_abs = logo_path_abs.replace("\\", "/")  # ✅ Fix for Windows
-        logo_tag = (
-            f'<img src="file://{logo_path_abs}" '
-            'style="width: 80px; height: 80px; margin-bottom: 10px;" alt="Logo">'
-            if os.path.exists(logo_path_abs)
-            else '<h2>Zoonotic AI</h2>'
-        )
-
-        # 🗂️ Format core report data for the table
-        report_data = []
-        for key, value in report.items():
-            if key in [
-                "_id", "suggestion_full", "risk_level", "risk_probability",
-                "suggestion", "raw_text", "llm_suggestion"
-            ]:
-                continue
-
-            display_key = key.replace('_', ' ').capitalize()
-            if isinstance(value, datetime.datetime):
-                display_value = value.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(value, (dict, list)):
-                display_value = str(value).replace("[", "").replace("]", "").replace("{", "").replace("}", "")
-            else:
-                display_value = str(value)
-
-            report_data.append(f"""
-                <tr>
-                    <td style="font-weight: bold;">{display_key}</td>
-                    <td>{display_value}</td>
-                </tr>
-            """)
-
-        # 🧾 Build HTML for PDF
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                @page {{ size: A4; margin: 1cm; }}
-                body {{ font-family: sans-serif; color: #333; }}
-                .logo {{ text-align: center; }}
-                h1 {{ color: #0B3954; font-size: 24px; text-align: center; margin-bottom: 5px; }}
-                h2 {{ color: #0B3954; font-size: 16px; margin-top: 15px; border-bottom: 1px solid #ccc; padding-bottom: 5px; }}
-                .subtitle {{ text-align: center; color: #666; margin-top: 0; margin-bottom: 20px; font-size: 12px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-bottom: 20px; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; font-size: 11px; }}
-                th {{ background-color: #0B3954; color: white; }}
-                .ai-box {{ border: 1px solid #0B3954; background-color: #E8F1F2; padding: 15px; margin-top: 10px; }}
-                .llm-box {{ border: 1px solid #0B5439; background-color: #F0FFF0; padding: 15px; margin-top: 10px; }}
-                .ai-box p, .llm-box p {{ margin: 0 0 5px 0; font-weight: bold; }}
-                .ai-box ul, .llm-box ul {{ list-style: disc; margin: 5px 0 0 20px; padding: 0; }}
-                .ai-box li, .llm-box li {{ margin-bottom: 5px; font-weight: normal; }}
-            </style>
-        </head>
-        <body>
-            <div class="logo">{logo_tag}</div>
-            <h1>Zoonotic Disease AI Report</h1>
-            <p class="subtitle">Report ID: {report_id} | Generated by AI-based Detection System</p>
-
-            <h2>Core Report Details</h2>
-            <table>
-                <thead>
-                    <tr><th style="width:30%;">Field</th><th>Value</th></tr>
-                </thead>
-                <tbody>
-                    {''.join(report_data)}
-                </tbody>
-            </table>
-            
-            <h2>Suggestions</h2>
-            
-            <div class="ai-box">
-                <p>AI Based Suggestions:</p>
-                <ul>
-                    {'\n'.join([f"<li>{s}</li>" for s in ai_suggestion_list]) or '<li>No model-based suggestion available.</li>'}
-                </ul>
-            </div>
-            
-            <div class="llm-box">
-                <p>Health Advice:</p>
-                <p style="font-weight: normal;">{llm_suggestion_text}</p>
-            </div>
-            
-            <p style="text-align: right; font-size: 10px; color: #999; margin-top: 40px;">
-                Report generated on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            </p>
-        </body>
-        </html>
-        """
-
-        # 🧠 Generate PDF in memory
-        buffer = BytesIO()
-        html = HTML(string=html_content)
-        html.write_pdf(target=buffer)
-        buffer.seek(0)
+        pdf_bytes = renderer.render(report_doc, serialize_report)
 
         # 📄 Return the file as a downloadable PDF
-        response = make_response(buffer.getvalue())
+        response = make_response(pdf_bytes)
         response.headers['Content-Type'] = 'application/pdf'
         response.headers['Content-Disposition'] = f'attachment; filename=AI_Report_{report_id}.pdf'
         return response
@@ -799,6 +1319,189 @@ def download_report(report_id):
         print(f"❌ Error during PDF generation: {e}")
         return jsonify({"error": f"Failed to generate PDF: {str(e)}"}), 500
 
+
+# ---------------- Bulk PDF Download (ZIP or merged PDF) ----------------
+BULK_PDF_MAX_REPORTS = int(os.getenv("BULK_PDF_MAX_REPORTS", "200"))
+bulk_pdf = BulkPDFExporter(pdf_renderer, max_workers=int(os.getenv("BULK_PDF_WORKERS", "0")) or None)
+
+@api.route('/download_reports', methods=['GET'])
+def download_reports_bulk():
+    # Select by ids=<id,id,...>, user_id, and/or a day (date=YYYY-MM-DD) or start/end range
+    output_format = request.args.get("format", "zip").lower()
+    if output_format not in ("zip", "pdf"):
+        return jsonify({"error": "format must be zip or pdf"}), 400
+
+    query = {}
+    try:
+        ids = [i.strip() for i in request.args.get("ids", "").split(",") if i.strip()]
+        if ids:
+            query["_id"] = {"$in": [ObjectId(i) for i in ids]}
+        user_id = request.args.get("user_id")
+        if user_id:
+            user_options = [user_id]
+            if ObjectId.is_valid(user_id):
+                user_options.append(ObjectId(user_id))
+            query["user_id"] = {"$in": user_options}
+        created_range = {}
+        if request.args.get("date"):
+            created_range["$gte"] = parse_export_date(request.args["date"])
+            created_range["$lt"] = parse_export_date(request.args["date"], end_of_day=True)
+        if request.args.get("start"):
+            created_range["$gte"] = parse_export_date(request.args["start"])
+        if request.args.get("end"):
+            created_range["$lt"] = parse_export_date(request.args["end"], end_of_day=True)
+        if created_range:
+            query["created_at"] = created_range
+    except (InvalidId, ValueError) as e:
+        return jsonify({"error": f"Invalid selection. {e}"}), 400
+
+    if not query:
+        return jsonify({"error": "Select reports with ids, user_id, date or start/end"}), 400
+
+    report_docs = list(
+        reports_collection.find(query).sort([("created_at", 1), ("_id", 1)]).limit(BULK_PDF_MAX_REPORTS + 1)
+    )
+    if not report_docs:
+        return jsonify({"error": "No reports match the selection"}), 404
+    if len(report_docs) > BULK_PDF_MAX_REPORTS:
+        return jsonify({"error": f"Selection exceeds {BULK_PDF_MAX_REPORTS} reports; narrow it down"}), 400
+
+    jobs = [(doc, build_report_sections(serialize_report(doc))) for doc in report_docs]
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+
+    headers = {
+        "Content-Disposition": f"attachment; filename=AI_Reports_{stamp}.{output_format}",
+        "X-Report-Count": str(len(jobs))
+    }
+    if output_format == "zip":
+        # Streamed: failures are listed in errors.txt inside the archive
+        return Response(stream_with_context(bulk_pdf.zip_stream(jobs)), mimetype="application/zip", headers=headers)
+
+    pdf_bytes, failures = bulk_pdf.merged_pdf(jobs)
+    if pdf_bytes is None:
+        return jsonify({"error": "Failed to generate any PDF", "failed_reports": failures}), 500
+    if failures:
+        # Also listed on the merged PDF's last page
+        headers["X-Failed-Reports"] = ",".join(f.split(":", 1)[0] for f in failures)
+    return Response(pdf_bytes, mimetype="application/pdf", headers=headers)
+
+@api.route('/admin/pdf_cache', methods=['GET'])
+def pdf_cache_stats():
+    if pdf_cache is None:
+        return jsonify({"enabled": False, "renderer": PDF_RENDERER})
+    return jsonify({"enabled": True, "renderer": PDF_RENDERER, **pdf_cache.stats()})
+
+# ---------------- Model Admin (registry / A/B) ----------------
+def model_admin_error(e):
+    if isinstance(e, (ValueError, KeyError, BundleError)):
+        return jsonify({"error": str(e)}), 400
+    print(f"❌ Model admin call failed: {e}")
+    return jsonify({"error": f"Model operation failed: {e}"}), 500
+
+def model_registry_unavailable():
+    if model_loader.error is not None:
+        return model_unavailable()
+    return jsonify({"error": "ML model is still loading. Retry shortly."}), 503
+
+@api.route("/admin/model", methods=["GET"])
+def model_info():
+    return jsonify({
+        **model_registry.status(),
+        "loader": model_loader.status(),
+        "bundle_dir": MODEL_BUNDLE_DIR,
+        "latest": latest_model_version(),
+        "available_versions": list_bundles(MODEL_BUNDLE_DIR)
+    })
+
+@api.route("/admin/model/reload", methods=["POST"])
+def model_reload():
+    # Activates {"version": ...} (default: models/LATEST); requests already running finish on the old model
+    if not model_registry.ready:
+        return model_registry_unavailable()
+    version = (request.get_json(silent=True) or {}).get("version")
+    try:
+        active, previous = model_registry.activate(version)
+    except Exception as e:
+        return model_admin_error(e)
+    return jsonify({"success": True, "version": active, "previous_version": previous})
+
+@api.route("/admin/model/candidate", methods=["POST"])
+def model_candidate():
+    # {"version": ..., "share": 0.1} routes 10% of users to the candidate; share 0 or no version ends it
+    if not model_registry.ready:
+        return model_registry_unavailable()
+    data = request.get_json(silent=True) or {}
+    try:
+        candidate = model_registry.set_candidate(data.get("version"), float(data.get("share", 0)))
+    except Exception as e:
+        return model_admin_error(e)
+    status = model_registry.status()
+    return jsonify({"success": True, "active": status["active"], "candidate": candidate,
+                    "candidate_share": status["candidate_share"]})
+
+@api.route("/admin/model/<version>", methods=["DELETE"])
+def model_unload(version):
+    try:
+        model_registry.unload(version)
+    except KeyError:
+        return jsonify({"error": f"Model {version} is not loaded"}), 404
+    except Exception as e:
+        return model_admin_error(e)
+    return jsonify({"success": True, "loaded": model_registry.status()["loaded"]})
+
+# ---------------- Health ----------------
+@api.route("/healthz", methods=["GET"])
+def healthz():
+    # Readiness: 200 once the model and indexes are loaded; never triggers a lazy load itself
+    components = {
+        "model": model_loader.status(),
+        "mongo_indexes": index_loader.status(),
+        # A client swapped in directly (not a LazyService) is always ready
+        "llm_client": {"state": "ready" if getattr(llm_client, "loaded", True) else "lazy"},
+        "llm_backfill": {"state": "running" if LLM_BACKFILL_ENABLED else ("disabled" if LLM_CONFIGURED else "no_api_key")},
+        "ner": ner_loader.status() if ner_loader is not None else {"state": "disabled"},
+    }
+    if ner_loader is not None and ner_loader.ready:
+        components["ner"]["stats"] = ner_loader.value.stats()
+    ready = model_loader.ready and index_loader.ready
+    failed = model_loader.error is not None or index_loader.error is not None
+    status = "ok" if ready else ("degraded" if failed else "starting")
+    return jsonify({"status": status, "ready": ready, "components": components,
+                    "startup": startup_profile.as_dict()}), 200 if ready else 503
+
+startup_profile.mark("module setup")
+
+# ---------------- App Factory ----------------
+def create_app(start_background=True):
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    flask_app.register_blueprint(api)
+    if start_background:
+        # Slow startup work happens off the import path; /healthz reports when it is done
+        index_loader.start()
+        model_loader.start()
+        if ner_loader is not None:
+            ner_loader.start()
+        if LLM_BACKFILL_ENABLED:
+            llm_backfill.start()
+    startup_profile.mark("create_app")
+    return flask_app
+
+# `app:app` for existing WSGI configs; `app:create_app()` works too.
+# Built on first access rather than at import: the OCR and bulk-PDF pools spawn worker
+# processes, which re-import this file as __mp_main__ and must not start the loaders.
+_app = None
+_app_lock = threading.Lock()
+
+def __getattr__(name):
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+    return _app
+
 # ---------------- Run App ----------------
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,80 @@
+"""
+Pluggable storage and LLM backends.
+
+app.py builds its Mongo and LLM clients through these factories, so the
+API can run without a Mongo server or an OpenAI key (local development,
+load tests):
+
+  MONGO_BACKEND=mongo      real server at MONGO_URI (default)
+  MONGO_BACKEND=mongomock  in-process store (``pip install mongomock``)
+
+  LLM_BACKEND=openai       OpenAI client (default)
+  LLM_BACKEND=fake         canned suggestion after FAKE_LLM_LATENCY_MS
+                           (+/- FAKE_LLM_JITTER_MS), failing with
+                           probability FAKE_LLM_FAILURE_RATE
+"""
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+MONGO_BACKENDS = ("mongo", "mongomock")
+LLM_BACKENDS = ("openai", "fake")
+
+FAKE_SUGGESTION = (
+    "1. Rest and drink plenty of fluids.\n"
+    "2. Monitor your temperature and symptoms daily.\n"
+    "3. See a doctor promptly if symptoms get worse."
+)
+
+
+def create_mongo_client(backend="mongo", uri="mongodb://localhost:27017"):
+    if backend == "mongo":
+        from pymongo import MongoClient
+        # connect=False: no monitor threads until first use, so pool processes that import app.py stay idle
+        return MongoClient(uri, connect=False)
+    if backend == "mongomock":
+        import mongomock
+        return mongomock.MongoClient()
+    raise ValueError(f"Unknown MONGO_BACKEND '{backend}'; expected one of {MONGO_BACKENDS}")
+
+
+class FakeLLMClient:
+    # Mirrors the slice of the OpenAI client the app uses: client.chat.completions.create(...)
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, failure_rate=0.0, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model=None, messages=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.failure_rate
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake LLM timed out after {timeout}s")
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("Fake LLM failure")
+        message = SimpleNamespace(role="assistant", content=FAKE_SUGGESTION)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message)])
+
+
+def create_llm_client(backend="openai", api_key=None):
+    if backend == "openai":
+        from openai import OpenAI
+        # LLMJobQueue owns retries, backoff and llm_attempts; the SDK's own retries would multiply them
+        return OpenAI(api_key=api_key, max_retries=0)
+    if backend == "fake":
+        return FakeLLMClient(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "200")),
+            jitter_ms=float(os.getenv("FAKE_LLM_JITTER_MS", "50")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+        )
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'; expected one of {LLM_BACKENDS}")
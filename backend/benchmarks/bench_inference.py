@@ -0,0 +1,246 @@
+"""
+Offline evaluation + inference benchmark on zoonotic_test_large.csv.
+
+Scores the deployed model the way app.py loads it: the models/LATEST
+bundle, or the legacy ``xgboost_disease_model.pkl`` + ``label_encoder.pkl``
+when there is no bundle (``--source`` forces one). It reports:
+
+  * quality     - accuracy, macro F1, per-class precision/recall/F1,
+                  confusion matrix, log loss, Brier score and calibration
+                  (expected calibration error + reliability bins)
+  * latency     - single-row p50/p99 and rows/s for the original request
+                  path (one-hot DataFrame -> XGBClassifier.predict_proba ->
+                  label_encoder.inverse_transform on the legacy pickles) and
+                  for SymptomInferenceEngine without and with its prediction
+                  cache; batched rows/s for the original path vs
+                  predict_many at several batch sizes
+
+Everything goes to a JSON file. ``--baseline`` compares against an earlier
+run; the exit code is 1 when accuracy drops or a latency gets slower than
+``--tolerance``. Run from backend/:
+
+    python benchmarks/bench_inference.py [--output bench_inference.json] [--baseline old.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from inference_engine import SymptomInferenceEngine  # noqa: E402
+from model_bundle import LATEST_FILE, load_bundle  # noqa: E402
+from symptom_matcher import FEATURE_NAMES  # noqa: E402
+
+TARGET_COL = "label"
+BATCH_SIZES = (1, 32, 256, 1024)
+
+
+# ---------------- Loading ----------------
+def load_pickles():
+    import joblib
+
+    model = joblib.load(os.path.join(BACKEND_DIR, "xgboost_disease_model.pkl"))
+    label_encoder = joblib.load(os.path.join(BACKEND_DIR, "label_encoder.pkl"))
+    return model, label_encoder
+
+
+def load_engine(source, models_dir, cache_size):
+    if source == "auto":
+        source = "bundle" if os.path.isfile(os.path.join(models_dir, LATEST_FILE)) else "pickle"
+    if source == "bundle":
+        bundle = load_bundle(models_dir)
+        return SymptomInferenceEngine.from_bundle(bundle, cache_size=cache_size), f"bundle {bundle.version}"
+    model, label_encoder = load_pickles()
+    engine = SymptomInferenceEngine(model, label_encoder.classes_, FEATURE_NAMES, version="legacy-pickle",
+                                    cache_size=cache_size)
+    return engine, "legacy pickles"
+
+
+def load_test_set(path, feature_names):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    X = df[list(feature_names)].to_numpy(dtype=np.float32)
+    symptom_lists = [[feature_names[j] for j in np.flatnonzero(row)] for row in X]
+    return X, df[TARGET_COL].astype(str).to_numpy(), symptom_lists
+
+
+# ---------------- Quality ----------------
+def calibration(confidence, correct, bins):
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidence, edges[1:-1]), 0, bins - 1)
+    ece = 0.0
+    table = []
+    for b in range(bins):
+        in_bin = which == b
+        if not in_bin.any():
+            continue
+        conf, acc = float(confidence[in_bin].mean()), float(correct[in_bin].mean())
+        ece += in_bin.mean() * abs(acc - conf)
+        table.append({"bin": [round(edges[b], 2), round(edges[b + 1], 2)], "count": int(in_bin.sum()),
+                      "mean_confidence": round(conf, 4), "accuracy": round(acc, 4)})
+    return round(float(ece), 4), table
+
+
+def evaluate(engine, X, labels, bins):
+    from sklearn.metrics import classification_report, confusion_matrix, log_loss
+
+    classes = engine.class_names
+    known = np.isin(labels, classes)
+    X, labels = X[known], labels[known]
+    proba = engine._predict_proba(X)
+    y_true = np.array([classes.index(label) for label in labels])
+    y_pred = proba.argmax(axis=1)
+    report = classification_report(y_true, y_pred, labels=range(len(classes)), target_names=classes,
+                                   output_dict=True, zero_division=0)
+    one_hot = np.eye(len(classes))[y_true]
+    ece, reliability = calibration(proba.max(axis=1), (y_pred == y_true).astype(float), bins)
+    return {
+        "rows": int(len(labels)),
+        "skipped_unknown_labels": int((~known).sum()),
+        "accuracy": round(float(report["accuracy"]), 4),
+        "f1_macro": round(float(report["macro avg"]["f1-score"]), 4),
+        "per_class": {
+            c: {k: round(float(report[c][k]), 4) if k != "support" else int(report[c][k])
+                for k in ("precision", "recall", "f1-score", "support")}
+            for c in classes
+        },
+        "confusion_matrix": {"labels": classes, "matrix": confusion_matrix(y_true, y_pred).tolist()},
+        "log_loss": round(float(log_loss(y_true, proba, labels=range(len(classes)))), 4),
+        "brier": round(float(((proba - one_hot) ** 2).sum(axis=1).mean()), 4),
+        "ece": ece,
+        "reliability": reliability,
+    }
+
+
+# ---------------- Latency ----------------
+def latency_summary(seconds, rows_per_call=1):
+    ms = np.array(seconds) * 1000
+    return {
+        "calls": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "rows_per_s": round(rows_per_call * len(ms) / (ms.sum() / 1000)),
+    }
+
+
+def time_calls(fn, inputs, repeat):
+    for item in inputs[:5]:
+        fn(item)
+    seconds = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def original_predict(model, label_encoder, symptom_lists):
+    # The pre-engine request path in app.py: a one-hot DataFrame over FEATURE_NAMES,
+    # XGBClassifier.predict_proba, then label_encoder.inverse_transform
+    rows = [[1 if f in symptoms else 0 for f in FEATURE_NAMES] for symptoms in symptom_lists]
+    X = pd.DataFrame(rows, columns=FEATURE_NAMES)
+    proba = model.predict_proba(X)
+    return label_encoder.inverse_transform(np.argmax(proba, axis=1))
+
+
+def benchmark(engine, cached_engine, symptom_lists, repeat):
+    model, label_encoder = load_pickles()
+    original = lambda batch: original_predict(model, label_encoder, batch)  # noqa: E731
+    single = {
+        "original": latency_summary(time_calls(lambda s: original([s]), symptom_lists, repeat)),
+        "engine": latency_summary(time_calls(engine.predict_one, symptom_lists, repeat)),
+    }
+    cached_engine.predict_many(symptom_lists)  # every test combination is now cached
+    single["engine_cached"] = latency_summary(time_calls(cached_engine.predict_one, symptom_lists, repeat))
+
+    batched = {}
+    for size in BATCH_SIZES:
+        if size > len(symptom_lists):
+            continue
+        batches = [symptom_lists[i:i + size] for i in range(0, len(symptom_lists) - size + 1, size)]
+        batched[str(size)] = {
+            "original": latency_summary(time_calls(original, batches, repeat), size),
+            "engine": latency_summary(time_calls(engine.predict_many, batches, repeat), size),
+        }
+    return {"single_row": single, "batched": batched}
+
+
+# ---------------- Regression check ----------------
+def compare(result, baseline, tolerance):
+    problems = []
+    if result["quality"]["accuracy"] < baseline["quality"]["accuracy"]:
+        problems.append(f"accuracy {baseline['quality']['accuracy']} -> {result['quality']['accuracy']}")
+    for path, old, new in latency_pairs(result["latency"], baseline["latency"]):
+        if old and new > old * (1 + tolerance):
+            problems.append(f"{path} p50 {old} -> {new} ms")
+    return problems
+
+
+def latency_pairs(new, old, prefix=""):
+    for key, value in new.items():
+        if key not in old:
+            continue
+        if isinstance(value, dict) and "p50_ms" in value:
+            yield prefix + key, old[key]["p50_ms"], value["p50_ms"]
+        elif isinstance(value, dict):
+            yield from latency_pairs(value, old[key], f"{prefix}{key}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the deployed model and benchmark inference paths.")
+    parser.add_argument("--data", default=os.path.join(BACKEND_DIR, "zoonotic_test_large.csv"))
+    parser.add_argument("--source", choices=("auto", "bundle", "pickle"), default="auto",
+                        help="model artifact to score (auto = what app.py would load)")
+    parser.add_argument("--models-dir", default=os.getenv("MODEL_BUNDLE_DIR", os.path.join(BACKEND_DIR, "models")))
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the test set per latency measurement")
+    parser.add_argument("--bins", type=int, default=10, help="calibration bins")
+    parser.add_argument("--output", default="bench_inference.json")
+    parser.add_argument("--baseline", help="earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs baseline")
+    args = parser.parse_args()
+
+    engine, artifact = load_engine(args.source, args.models_dir, cache_size=0)
+    cached_engine, _ = load_engine(args.source, args.models_dir, cache_size=4096)
+    X, labels, symptom_lists = load_test_set(args.data, engine.feature_names)
+
+    result = {
+        "artifact": artifact,
+        "model_version": engine.version,
+        "dataset": os.path.basename(args.data),
+        "quality": evaluate(engine, X, labels, args.bins),
+        "latency": benchmark(engine, cached_engine, symptom_lists, args.repeat),
+    }
+    quality, single = result["quality"], result["latency"]["single_row"]
+    print(f"📊 {artifact}: accuracy {quality['accuracy']}, macro F1 {quality['f1_macro']}, "
+          f"log loss {quality['log_loss']}, ECE {quality['ece']} on {quality['rows']} rows")
+    for name, stats in single.items():
+        print(f"  single {name:14} p50 {stats['p50_ms']:8.4f} ms  p99 {stats['p99_ms']:8.4f} ms  "
+              f"{stats['rows_per_s']:>10,} rows/s")
+    for size, paths in result["latency"]["batched"].items():
+        print(f"  batch {size:>5}  original {paths['original']['rows_per_s']:>10,} rows/s   "
+              f"engine {paths['engine']['rows_per_s']:>10,} rows/s")
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"❌ Regression: {problem}")
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
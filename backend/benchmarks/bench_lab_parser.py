@@ -0,0 +1,96 @@
+"""
+Lab-report parser benchmark.
+
+Checks that lab_report_parser gives the same output as the original
+four-regex implementation on every sample in benchmarks/lab_reports/, then
+times both. Run from backend/:
+
+    python benchmarks/bench_lab_parser.py [--repeat 2000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from lab_report_parser import parse_lab_report  # noqa: E402
+
+CORPUS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "lab_reports")
+
+
+def legacy_parse(text):
+    # The per-request implementation that used to live in upload_file
+    disease_match = re.search(r"(Dengue|Nipah|Rabies|Zoonotic)", text, re.IGNORECASE)
+    result_match = re.search(r"Overall result:\s*(Positive|Negative|Detected|Not Detected)", text, re.IGNORECASE)
+
+    ct_values = {}
+    matches_format1 = re.findall(r"([A-Za-z0-9]+ gene).?\(Ct\s*=?\s*([\d.]+)\)", text, re.IGNORECASE)
+    matches_format2 = re.findall(r"(NS1 gene|E gene|N gene|G gene)\s+(Detected|Positive|Negative)\s*([\d.]+)?", text, re.IGNORECASE)
+
+    for gene, value in matches_format1:
+        ct_values[gene.strip()] = value
+    for gene, _, value in matches_format2:
+        if value: ct_values[gene.strip()] = value
+
+    def ct_to_risk(ct_vals):
+        numeric_cts = [float(v) for v in ct_vals.values() if v and re.match(r"^\d+\.?\d*$", v)]
+        if not numeric_cts: return "Unknown"
+        min_ct = min(numeric_cts)
+        if min_ct < 20: return "High"
+        if min_ct <= 30: return "Moderate"
+        return "Low"
+
+    return {
+        "disease": disease_match.group(1) if disease_match else "Unknown",
+        "result": result_match.group(1) if result_match else "Unknown",
+        "ct_values": ct_values,
+        "risk_level": ct_to_risk(ct_values),
+    }
+
+
+def load_corpus():
+    corpus = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if name.endswith(".txt"):
+            with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+                corpus[name] = f.read()
+    return corpus
+
+
+def time_parser(parse, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, repeat * len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lab-report parser against the legacy regex passes.")
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the corpus per parser")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mismatches = 0
+    for name, text in corpus.items():
+        new, old = parse_lab_report(text), legacy_parse(text)
+        status = "ok" if new == old else "MISMATCH"
+        mismatches += status != "ok"
+        print(f"{status:8} {name:36} {new['disease']:8} {new['result']:13} {new['ct_values']}")
+        if new != old:
+            print(f"         legacy: {old}")
+
+    texts = list(corpus.values())
+    legacy_time, legacy_rate = time_parser(legacy_parse, texts, args.repeat)
+    new_time, new_rate = time_parser(parse_lab_report, texts, args.repeat)
+    print(f"\nlegacy : {legacy_rate:10.0f} reports/s ({legacy_time:.3f}s)")
+    print(f"parser : {new_rate:10.0f} reports/s ({new_time:.3f}s)  x{new_rate / legacy_rate:.2f}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+PDF renderer benchmark: WeasyPrint vs ReportLab.
+
+Renders the same synthetic reports with each backend of pdf_renderer and
+reports per-document latency (mean / p50 / p95), output size, peak Python
+allocations (tracemalloc, separate pass) and peak process RSS. Each backend
+runs in its own subprocess so RSS and import costs do not leak between
+them. Run from backend/:
+
+    python benchmarks/bench_pdf_renderers.py [--reports 50] [--backends weasyprint,reportlab]
+"""
+import argparse
+import datetime
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bson import ObjectId  # noqa: E402
+
+from pdf_renderer import PDF_BACKENDS, ReportPDFRenderer, build_report_sections  # noqa: E402
+
+STATIC_DIR = os.path.join(BACKEND_DIR, "static")
+SYMPTOMS = ["fever", "headache", "rash", "joint pain", "bleeding", "vomiting", "anxiety", "hydrophobia"]
+DISEASES = ["Dengue", "Nipah", "Rabies"]
+
+
+def sample_report(i):
+    # Shaped like serialize_report() output for an ML prediction
+    return {
+        "_id": ObjectId(),
+        "user_id": str(ObjectId()),
+        "disease": DISEASES[i % 3],
+        "confidence": round(0.5 + (i % 50) / 100, 2),
+        "symptoms_reported": SYMPTOMS[: 3 + i % 5],
+        "matched_symptoms": SYMPTOMS[: 2 + i % 4],
+        "created_at": datetime.datetime(2025, 1, 1) + datetime.timedelta(minutes=i),
+        "source": "ml-symptoms",
+        "suggestion": {"AI Suggestion": ["Stay hydrated and rest.", "Monitor temperature every 6 hours.",
+                                         "Seek medical care if symptoms worsen."]},
+        "suggestion_summary": "Risk: Moderate",
+        "llm_suggestion": "Drink plenty of fluids, avoid self-medicating with NSAIDs and visit a clinic "
+                          "for a confirmatory test. " * 3,
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_backend(backend, count):
+    renderer = ReportPDFRenderer(STATIC_DIR, backend=backend)
+    sections = [build_report_sections(sample_report(i)) for i in range(count)]
+
+    start = time.perf_counter()
+    renderer.warm_up()
+    renderer.render_sections(sections[0])
+    first_ms = (time.perf_counter() - start) * 1000
+
+    latencies, sizes = [], []
+    for section in sections:
+        start = time.perf_counter()
+        pdf = renderer.render_sections(section)
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(pdf))
+
+    # Separate pass: tracemalloc slows allocation-heavy code too much to time under it
+    tracemalloc.start()
+    for section in sections[:10]:
+        renderer.render_sections(section)
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "backend": backend,
+        "reports": count,
+        "first_render_ms": round(first_ms, 1),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "docs_per_s": round(1000 / statistics.mean(latencies), 1),
+        "avg_pdf_kb": round(statistics.mean(sizes) / 1024, 1),
+        "peak_alloc_mb": round(peak_alloc / 2**20, 1),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the WeasyPrint and ReportLab PDF backends.")
+    parser.add_argument("--reports", type=int, default=50, help="documents rendered per backend")
+    parser.add_argument("--backends", default=",".join(PDF_BACKENDS), help="comma separated backends to compare")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.reports)))
+        return 0
+
+    results = []
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", backend, "--reports", str(args.reports)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            last_line = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"⚠️ {backend}: {last_line}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return 1
+    columns = ["backend", "first_render_ms", "mean_ms", "p50_ms", "p95_ms", "docs_per_s",
+               "avg_pdf_kb", "peak_alloc_mb", "peak_rss_mb"]
+    print("  ".join(f"{c:>15}" for c in columns))
+    for row in results:
+        print("  ".join(f"{row[c]:>15}" for c in columns))
+    by_backend = {row["backend"]: row for row in results}
+    if {"weasyprint", "reportlab"} <= set(by_backend):
+        speedup = by_backend["weasyprint"]["mean_ms"] / by_backend["reportlab"]["mean_ms"]
+        print(f"\nreportlab vs weasyprint: x{speedup:.2f} mean latency")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
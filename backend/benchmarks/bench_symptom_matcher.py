@@ -0,0 +1,106 @@
+"""
+Symptom matcher benchmark.
+
+Times three ways of turning symptom input into feature names on the same
+generated corpus:
+
+  * legacy    - split on commas, exact SYNONYM_MAP lookup (misses free text)
+  * regex     - one word-boundary regex search per known phrase
+  * matcher   - symptom_matcher.SymptomMatcher, one pass over the words
+
+and reports texts/s, MB/s and how many features each approach recovers.
+Run from backend/:
+
+    python benchmarks/bench_symptom_matcher.py [--texts 20000] [--words 40]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from symptom_matcher import FEATURE_NAMES, SYNONYM_MAP, SymptomMatcher, lexicon_paths_from_env  # noqa: E402
+
+FILLER = ("i", "have", "had", "and", "a", "since", "two", "days", "my", "son", "with", "very", "bad",
+          "some", "after", "the", "trip", "also", "mild", "at", "night", "feeling", "since", "monday")
+
+
+def make_corpus(matcher, count, words, seed):
+    rng = random.Random(seed)
+    phrases = sorted(phrase for phrase, _ in matcher.phrases())
+    corpus = []
+    for _ in range(count):
+        parts = []
+        while sum(len(p.split()) for p in parts) < words:
+            parts.append(rng.choice(phrases) if rng.random() < 0.3 else rng.choice(FILLER))
+        # Half comma-separated lists (what the API used to expect), half free text
+        corpus.append(", ".join(parts) if rng.random() < 0.5 else " ".join(parts))
+    return corpus
+
+
+def legacy_normalize(text):
+    items = [s.strip().lower() for s in text.split(",") if s.strip()]
+    return [s for s in (SYNONYM_MAP.get(i, i) for i in items) if s in FEATURE_NAMES]
+
+
+def regex_normalizer(matcher):
+    # One pattern per phrase, longest first; found features are unioned (no overlap handling)
+    compiled = []
+    for phrase, features in sorted(matcher.phrases(), key=lambda item: len(item[0]), reverse=True):
+        compiled.append((re.compile(r"\b" + r"\W+".join(map(re.escape, phrase.split())) + r"\b"), features))
+
+    def normalize(text):
+        text = text.lower()
+        found = {}
+        for pattern, features in compiled:
+            if pattern.search(text):
+                for f in features:
+                    found[f] = None
+        return list(found)
+
+    return normalize
+
+
+def run(name, normalize, corpus, repeat):
+    normalize(corpus[0])
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(normalize(text)) for text in corpus)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    size_mb = sum(len(t) for t in corpus) / 1e6
+    print(f"{name:8} {len(corpus) / best:12,.0f} texts/s {size_mb / best:8.2f} MB/s "
+          f"{best / len(corpus) * 1e6:8.2f} us/text   features found: {found}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark symptom normalization approaches.")
+    parser.add_argument("--texts", type=int, default=20000, help="texts in the generated corpus")
+    parser.add_argument("--words", type=int, default=40, help="approximate words per text")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per approach (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = SymptomMatcher(lexicon_paths=lexicon_paths_from_env())
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"matcher: {matcher.phrase_count} phrases, up to {matcher.max_phrase_words} words, "
+          f"built in {build_ms:.2f} ms")
+
+    corpus = make_corpus(matcher, args.texts, args.words, args.seed)
+    print(f"corpus : {len(corpus)} texts, {sum(len(t) for t in corpus) / 1e6:.2f} MB\n")
+    run("legacy", legacy_normalize, corpus, args.repeat)
+    regex_s = run("regex", regex_normalizer(matcher), corpus, args.repeat)
+    matcher_s = run("matcher", matcher.match, corpus, args.repeat)
+    print(f"\nmatcher vs per-phrase regex: x{regex_s / matcher_s:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
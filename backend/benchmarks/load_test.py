@@ -0,0 +1,280 @@
+"""
+Load test for the Flask API.
+
+Drives /predict_symptoms, /upload, /reports and /download_report/<id> with
+a weighted request mix from ``--concurrency`` client threads for
+``--duration`` seconds, then reports throughput and latency percentiles per
+endpoint (and writes them as JSON with ``--output``).
+
+Without ``--url`` the app is started in-process on a local port with the
+stand-in backends from backends.py: an in-process Mongo (mongomock) and a
+fake LLM with ``--llm-latency-ms`` latency. No Mongo server or OpenAI key
+is needed. Point ``--url`` at a running server to test a real deployment.
+Run from backend/:
+
+    python benchmarks/load_test.py [--concurrency 16] [--duration 30] [--mix predict=6,reports=2,download=1,upload=1]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from symptom_matcher import FEATURE_NAMES  # noqa: E402
+
+ENDPOINTS = ("predict", "reports", "download", "upload")
+LAB_REPORTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "lab_reports")
+
+
+# ---------------- Target ----------------
+def start_local_server(llm_latency_ms, ready_timeout):
+    # Stand-in backends unless the caller already chose others
+    os.environ.setdefault("MONGO_BACKEND", "mongomock")
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    os.environ.setdefault("FAKE_LLM_LATENCY_MS", str(llm_latency_ms))
+    os.environ.setdefault("LLM_BACKFILL_ENABLED", "0")
+    os.chdir(BACKEND_DIR)
+    import logging
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no access log line per request
+
+    import app as app_module
+
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    wait_ready(url, ready_timeout)
+    return url, server
+
+
+def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/healthz", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url}/healthz not ready after {timeout}s")
+
+
+# ---------------- Requests ----------------
+def http(method, url, body=None, headers=None, timeout=60):
+    request = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def post_json(url, payload):
+    return http("POST", url, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def lab_report_pdfs():
+    # Text-layer PDFs of the lab-report samples, so /upload exercises extraction + parsing, not tesseract
+    import fitz
+
+    pdfs = []
+    for path in sorted(glob.glob(os.path.join(LAB_REPORTS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 559, 806), text, fontsize=9)
+        pdfs.append((os.path.basename(path).replace(".txt", ".pdf"), doc.tobytes()))
+        doc.close()
+    return pdfs
+
+
+class Scenario:
+    def __init__(self, url, users, report_ids, pdfs, renderer):
+        self.url = url
+        self.users = users
+        self.report_ids = report_ids
+        self.pdfs = pdfs
+        self.renderer = renderer
+
+    def predict(self, rng):
+        symptoms = rng.sample(FEATURE_NAMES, rng.randint(2, 5))
+        return post_json(f"{self.url}/predict_symptoms", {"user_id": rng.choice(self.users),
+                                                          "symptoms": ", ".join(symptoms)})
+
+    def reports(self, rng):
+        return http("GET", f"{self.url}/reports?user_id={rng.choice(self.users)}&limit=20")
+
+    def download(self, rng):
+        query = f"?renderer={self.renderer}" if self.renderer else ""
+        return http("GET", f"{self.url}/download_report/{rng.choice(self.report_ids)}{query}")
+
+    def upload(self, rng):
+        filename, content = rng.choice(self.pdfs)
+        # A unique trailer per upload: otherwise the OCR result cache answers every request after the first
+        content = content + f"\n% {uuid.uuid4().hex}\n".encode()
+        body, headers = multipart({"user_id": rng.choice(self.users)},
+                                  {"file": (filename, content, "application/pdf")})
+        return http("POST", f"{self.url}/upload", body, headers)
+
+
+def seed_reports(scenario, count, rng):
+    ids = []
+    for _ in range(count):
+        status, body = scenario.predict(rng)
+        if status == 200:
+            ids.append(json.loads(body)["_id"])
+    if not ids:
+        raise RuntimeError("Could not create any reports to download")
+    return ids
+
+
+# ---------------- Load ----------------
+def run_load(scenario, mix, concurrency, duration, seed):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}  # (seconds, status)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        local = {name: [] for name in names}
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status, _ = getattr(scenario, name)(rng)
+            except Exception:
+                status = 0
+            local[name].append((time.perf_counter() - start, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(values, elapsed):
+    if not values:
+        return {"requests": 0}
+    ms = np.array([seconds for seconds, _ in values]) * 1000
+    statuses = {}
+    for _, status in values:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(values),
+        "errors": sum(1 for _, status in values if not 200 <= status < 300),
+        "rps": round(len(values) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p90_ms": round(float(np.percentile(ms, 90)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "status": statuses,
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}'; expected {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API and report per-endpoint latency.")
+    parser.add_argument("--url", help="running server (default: start app.py in-process with stand-in backends)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("predict=6,reports=2,download=1,upload=1"))
+    parser.add_argument("--users", type=int, default=50, help="distinct user ids")
+    parser.add_argument("--seed-reports", type=int, default=20, help="reports created up front for downloads")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="fake LLM latency (in-process only)")
+    parser.add_argument("--pdf-renderer", help="renderer query parameter for /download_report")
+    parser.add_argument("--ready-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url, server = start_local_server(args.llm_latency_ms, args.ready_timeout)
+    else:
+        url = url.rstrip("/")
+        wait_ready(url, args.ready_timeout)
+
+    mix = dict(args.mix)
+    pdfs = []
+    if "upload" in mix:
+        try:
+            pdfs = lab_report_pdfs()
+        except ImportError:
+            print("⚠️ PyMuPDF is not installed; skipping /upload")
+            mix.pop("upload")
+    rng = random.Random(args.seed)
+    users = [f"loadtest-{i}" for i in range(args.users)]
+    scenario = Scenario(url, users, [], pdfs, args.pdf_renderer)
+    if "download" in mix:
+        scenario.report_ids = seed_reports(scenario, args.seed_reports, rng)
+
+    print(f"💡 {url}: {args.concurrency} clients for {args.duration:.0f}s, mix {mix}")
+    samples, elapsed = run_load(scenario, mix, args.concurrency, args.duration, args.seed)
+    results = {name: summarize(values, elapsed) for name, values in samples.items()}
+    results["all"] = summarize([v for values in samples.values() for v in values], elapsed)
+
+    print(f"\n{'endpoint':10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for name, stats in results.items():
+        if stats["requests"]:
+            print(f"{name:10} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>8} {stats['p50_ms']:>9} "
+                  f"{stats['p90_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"url": url, "concurrency": args.concurrency, "duration_s": round(elapsed, 2),
+                       "mix": mix, "endpoints": results}, f, indent=2)
+        print(f"\n✅ Wrote {args.output}")
+    if server is not None:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
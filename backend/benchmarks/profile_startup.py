@@ -0,0 +1,117 @@
+"""
+Cold-start profile for the API.
+
+Imports app.py in a fresh interpreter under ``python -X importtime`` and
+prints the wall time of the import, the slowest packages app.py pulls in
+(cumulative import time, including everything they import) and the
+startup phases app.py records itself. Pass ``--save`` to write a baseline
+and ``--baseline`` to compare against one; the exit code is 1 when the
+import got slower than ``--tolerance``. Run from backend/:
+
+    python benchmarks/profile_startup.py [--top 15] [--save startup.json | --baseline startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child; background loads start at the very end of the import, so they do not skew it
+CHILD_CODE = """
+import json, sys, time
+sys.stderr.write("APP_IMPORT_START\\n"); sys.stderr.flush()
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+sys.stderr.write("APP_IMPORT_END\\n"); sys.stderr.flush()
+print("STARTUP_JSON " + json.dumps({"import_s": elapsed, "phases_ms": app.startup_profile.as_dict()["phases_ms"]}))
+sys.exit(0)
+"""
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:  self [us] | cumulative | <indent>package", children before parents.
+    # Only imports between the markers count: interpreter startup and the background model load are excluded.
+    entries = []
+    inside = False
+    for line in stderr.splitlines():
+        if line.startswith("APP_IMPORT_"):
+            inside = line == "APP_IMPORT_START"
+            continue
+        if not inside or not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((depth, name.strip().split(".")[0], int(cumulative)))
+
+    # Walk parents-first; a package is counted at its outermost import only
+    per_package = defaultdict(int)
+    ancestors = []
+    for depth, package, cumulative in reversed(entries):
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        if package != "app" and package not in {p for _, p in ancestors}:
+            per_package[package] += cumulative
+        ancestors.append((depth, package))
+    return per_package
+
+
+def profile():
+    env = dict(os.environ, LLM_BACKFILL_ENABLED="0")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+                          cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    summary = next((line for line in proc.stdout.splitlines() if line.startswith("STARTUP_JSON ")), None)
+    if summary is None:
+        raise RuntimeError(f"Importing app failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(summary[len("STARTUP_JSON "):])
+    result["process_s"] = wall
+    result["packages_ms"] = {k: round(v / 1000, 1) for k, v in parse_importtime(proc.stderr).items()}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown for app.py")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--save", help="write the profile as JSON (baseline for later runs)")
+    parser.add_argument("--baseline", help="compare against a saved profile")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    result = profile()
+    print(f"import app : {result['import_s'] * 1000:8.1f} ms   (interpreter + import: {result['process_s'] * 1000:.1f} ms)")
+    print("\nstartup phases (app.py):")
+    for name, ms in result["phases_ms"].items():
+        print(f"  {name:30} {ms:8.1f} ms")
+    # Cumulative times include nested packages, so rows overlap (xgboost includes numpy, ...)
+    print("\nslowest packages imported by app (cumulative):")
+    ranked = sorted(result["packages_ms"].items(), key=lambda item: item[1], reverse=True)
+    for name, ms in ranked[:args.top]:
+        print(f"  {name:30} {ms:8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Saved profile to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        ratio = result["import_s"] / baseline["import_s"]
+        print(f"\nvs baseline: x{ratio:.2f} import time")
+        new_packages = sorted(set(result["packages_ms"]) - set(baseline["packages_ms"]))
+        if new_packages:
+            print(f"  new top-level imports: {', '.join(new_packages)}")
+        if ratio > 1 + args.tolerance:
+            print(f"❌ Startup regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,49 @@
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
-import pandas as pd
+import os
+
 import joblib
+import numpy as np
 
-# --- Load BioBERT for NER ---
-tokenizer = AutoTokenizer.from_pretrained("d4data/biobert_ner")
-model = AutoModelForTokenClassification.from_pretrained("d4data/biobert_ner")
-ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+from symptom_matcher import SymptomMatcher, lexicon_paths_from_env
 
 # --- Load trained XGBoost model ---
 xgb_model = joblib.load("xgboost_model.pkl")
 symptom_list = joblib.load("symptom_list.pkl")  # same order as training
 
 # --- Symptom Extraction ---
+# Compiled phrase matcher (feature names + synonyms + lexicons/*.json): one pass over the text.
+# Set NER_MODEL_PATH to a local NER model directory to also use the batched NER service.
+matcher = SymptomMatcher(symptom_list, lexicon_paths=lexicon_paths_from_env(), skip_unknown=True)
+symptom_index = {sym: i for i, sym in enumerate(symptom_list)}
+
+ner_service = None
+if os.getenv("NER_MODEL_PATH"):
+    from ner_service import NERService, load_ner_pipeline
+
+    ner_service = NERService(load_ner_pipeline(os.getenv("NER_MODEL_PATH"), os.getenv("NER_BACKEND", "torch"))).start()
+
+def extract_symptoms_many(texts):
+    found = [matcher.match(text) for text in texts]
+    if ner_service is not None:
+        # One call per text, but the service runs them as micro-batches
+        for symptoms, entities in zip(found, ner_service.extract_many(texts)):
+            symptoms.extend(s for e in entities for s in matcher.match(e["word"]) if s not in symptoms)
+    return found
+
 def extract_symptoms(text, symptom_list):
-    entities = ner_pipeline(text)
-    found = [e['word'].lower() for e in entities]
+    found = set(extract_symptoms_many([text])[0])
     return {sym: 1 if sym in found else 0 for sym in symptom_list}
 
 # --- Prediction ---
+def predict_diseases(user_texts):
+    X = np.zeros((len(user_texts), len(symptom_list)), dtype=np.float32)
+    for row, symptoms in enumerate(extract_symptoms_many(user_texts)):
+        for sym in symptoms:
+            X[row, symptom_index[sym]] = 1.0
+    return xgb_model.predict(X)
+
 def predict_disease(user_text):
-    vec = extract_symptoms(user_text, symptom_list)
-    X = pd.DataFrame([vec])
-    return xgb_model.predict(X)[0]
+    return predict_diseases([user_text])[0]
 
 # Example
-print(predict_disease("I have fever, vomiting and headache"))
+if __name__ == "__main__":
+    print(predict_disease("I have fever, vomiting and headache"))
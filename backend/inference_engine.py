@@ -0,0 +1,198 @@
+"""
+Precompiled symptom inference engine.
+
+Built once per loaded model (a model bundle, or the legacy XGBoost pickle +
+LabelEncoder) so the request path never touches pandas: symptoms are mapped
+to columns through a dict, written into a reusable per-thread feature buffer
+and scored with the booster's ``inplace_predict``.
+
+The model only sees which of its binary symptom features are set, so every
+input is one bitmask. Outputs are memoized per mask in a bounded LRU (and an
+optional precomputed table of frequent combinations): a repeated symptom
+combination never reaches XGBoost. Both live on the engine, so loading a
+new model version always starts with an empty cache.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from tracing import stage
+
+
+class PredictionCache:
+    # Bounded LRU of model outputs keyed by the symptom bitmask
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, mask):
+        with self._lock:
+            value = self._entries.get(mask)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(mask)
+            self.hits += 1
+            return value
+
+    def put(self, mask, value):
+        with self._lock:
+            self._entries[mask] = value
+            self._entries.move_to_end(mask)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class SymptomInferenceEngine:
+    def __init__(self, model, class_names, feature_names, version=None, cache_size=4096):
+        # Accept either the sklearn wrapper (XGBClassifier) or a raw Booster
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self.feature_names = tuple(feature_names)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.class_names = [str(c) for c in class_names]
+        self.version = version
+        self.n_features = len(self.feature_names)
+        self._local = threading.local()
+        self.cache = PredictionCache(cache_size) if cache_size else None
+        self._table = {}
+        self.table_hits = 0
+
+    @classmethod
+    def from_bundle(cls, bundle, **kwargs):
+        # Feature order and class names come from the bundle manifest, not from app constants
+        return cls(bundle.booster, bundle.class_names, bundle.feature_names, version=bundle.version, **kwargs)
+
+    # ---------------- Encoding ----------------
+    def _row_buffer(self):
+        # One preallocated (1, n_features) buffer per worker thread
+        buf = getattr(self._local, "row", None)
+        if buf is None:
+            buf = np.zeros((1, self.n_features), dtype=np.float32)
+            self._local.row = buf
+        return buf
+
+    def matched_symptoms(self, normalized_symptoms):
+        return [s for s in normalized_symptoms if s in self.feature_index]
+
+    def symptom_mask(self, normalized_symptoms):
+        # Every distinct model input is one n_features-bit integer
+        mask = 0
+        index = self.feature_index
+        for s in normalized_symptoms:
+            col = index.get(s)
+            if col is not None:
+                mask |= 1 << col
+        return mask
+
+    def encode_masks(self, masks):
+        X = np.zeros((len(masks), self.n_features), dtype=np.float32)
+        for row, mask in enumerate(masks):
+            while mask:
+                low = mask & -mask
+                X[row, low.bit_length() - 1] = 1.0
+                mask ^= low
+        return X
+
+    # ---------------- Scoring ----------------
+    def _predict_proba(self, X):
+        proba = self.booster.inplace_predict(X)
+        if proba.ndim == 1:
+            # Binary objective returns P(class 1) only
+            proba = np.column_stack([1.0 - proba, proba])
+        return proba
+
+    def _decode(self, proba_row):
+        # Cached output: (disease, confidence %, class probabilities)
+        best = int(proba_row.argmax())
+        confidence = round(float(proba_row[best]) * 100, 2)
+        return self.class_names[best], confidence, tuple(float(p) for p in proba_row)
+
+    # ---------------- Memoized prediction ----------------
+    def _lookup(self, mask):
+        output = self._table.get(mask)
+        if output is not None:
+            self.table_hits += 1
+            return output
+        return self.cache.get(mask) if self.cache is not None else None
+
+    def _store(self, mask, output):
+        if self.cache is not None:
+            self.cache.put(mask, output)
+
+    def predict_output(self, mask):
+        # Full model output for one symptom bitmask; XGBoost only runs on a cache miss
+        output = self._lookup(mask)
+        if output is None:
+            buf = self._row_buffer()
+            buf.fill(0.0)
+            bits = mask
+            while bits:
+                low = bits & -bits
+                buf[0, low.bit_length() - 1] = 1.0
+                bits ^= low
+            with stage("xgboost"):
+                output = self._decode(self._predict_proba(buf)[0])
+            self._store(mask, output)
+        return output
+
+    def predict_one(self, normalized_symptoms):
+        # Returns (disease, confidence %, matched_symptoms); repeat symptom combinations skip XGBoost
+        disease, confidence, _ = self.predict_output(self.symptom_mask(normalized_symptoms))
+        return disease, confidence, self.matched_symptoms(normalized_symptoms)
+
+    def predict_many(self, symptom_lists):
+        # Vectorized variant: one inplace_predict call for the distinct uncached combinations in the batch
+        if not symptom_lists:
+            return []
+        masks = [self.symptom_mask(symptoms) for symptoms in symptom_lists]
+        outputs = {}
+        missing = []
+        for mask in dict.fromkeys(masks):
+            output = self._lookup(mask)
+            if output is None:
+                missing.append(mask)
+            else:
+                outputs[mask] = output
+        if missing:
+            X = self.encode_masks(missing)
+            with stage("xgboost"):
+                proba = self._predict_proba(X)
+            for mask, row in zip(missing, proba):
+                outputs[mask] = self._decode(row)
+                self._store(mask, outputs[mask])
+        return [
+            (outputs[mask][0], outputs[mask][1], self.matched_symptoms(symptoms))
+            for mask, symptoms in zip(masks, symptom_lists)
+        ]
+
+    def precompute(self, symptom_lists):
+        # Builds a read-only table for the given (frequent) combinations in one batch; replaces any previous table
+        masks = list(dict.fromkeys(self.symptom_mask(symptoms) for symptoms in symptom_lists))
+        if not masks:
+            return 0
+        proba = self._predict_proba(self.encode_masks(masks))
+        self._table = {mask: self._decode(row) for mask, row in zip(masks, proba)}
+        return len(self._table)
+
+    def cache_stats(self):
+        stats = self.cache.stats() if self.cache is not None else {"enabled": False}
+        return {**stats, "table_entries": len(self._table), "table_hits": self.table_hits}
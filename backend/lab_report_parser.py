@@ -0,0 +1,125 @@
+"""
+Lab-report parser for OCR / PDF text.
+
+All patterns are compiled once at import and matched case-sensitively
+against a lower-cased copy of the report (lower-casing once is far cheaper
+than ``re.IGNORECASE`` on every pattern); captured values are sliced from
+the original text so their casing is preserved. Gene/Ct layouts are
+pluggable ``LabFormat`` templates, each with an optional literal ``anchor``
+that lets the scan skip the template when the text cannot match. Register
+new lab layouts with ``register_lab_format`` instead of adding regex passes
+to the request path.
+"""
+import re
+import threading
+
+CT_NUMBER_RE = re.compile(r"^\d+\.?\d*$")
+
+DISEASE_RE = re.compile(r"dengue|nipah|rabies|zoonotic")
+RESULT_RE = re.compile(r"overall result:\s*(positive|negative|detected|not detected)")
+
+
+class LabFormat:
+    # A gene/Ct line layout matched against lower-cased text: write literals in lower case and
+    # define the named groups ``gene`` and ``ct`` (ct may be optional)
+    def __init__(self, name, pattern, anchor=None):
+        self.name = name
+        self.regex = re.compile(pattern)
+        self.anchor = anchor
+        if not {"gene", "ct"} <= set(self.regex.groupindex):
+            raise ValueError(f"Lab format '{name}' must define (?P<gene>...) and (?P<ct>...) groups")
+
+
+DEFAULT_LAB_FORMATS = [
+    # "NS1 gene (Ct = 18.5)" / "N gene: (Ct 22)"
+    LabFormat(
+        "gene-ct-parenthesized",
+        r"(?P<gene>[a-z0-9]+ gene).?\(ct\s*=?\s*(?P<ct>[\d.]+)\)",
+        anchor="(ct"
+    ),
+    # "NS1 gene   Detected   18.5" (NS1 / E / N / G gene table rows)
+    LabFormat(
+        "gene-status-ct",
+        r"(?P<gene>ns1 gene|e gene|n gene|g gene)\s+(?:detected|positive|negative)\s*(?P<ct>[\d.]+)?",
+        anchor=" gene"
+    ),
+]
+
+
+def ct_to_risk(ct_vals):
+    numeric_cts = [float(v) for v in ct_vals.values() if v and CT_NUMBER_RE.match(v)]
+    if not numeric_cts: return "Unknown"
+    min_ct = min(numeric_cts)
+    if min_ct < 20: return "High"
+    if min_ct <= 30: return "Moderate"
+    return "Low"
+
+
+class LabReportParser:
+    def __init__(self, formats=None):
+        self._lock = threading.Lock()
+        self.formats = tuple(DEFAULT_LAB_FORMATS if formats is None else formats)
+
+    def register(self, lab_format):
+        # Formats are swapped as a new tuple so concurrent scans never see a half-updated list
+        with self._lock:
+            self.formats = self.formats + (lab_format,)
+
+    @staticmethod
+    def _fold(text):
+        lowered = text.lower()
+        # A few Unicode characters change length when lower-cased; keep offsets aligned by folding ASCII only
+        if len(lowered) != len(text):
+            lowered = "".join(c.lower() if c.isascii() else c for c in text)
+        return lowered
+
+    def _ct_matches(self, text, lowered):
+        for fmt in self.formats:
+            if fmt.anchor and fmt.anchor not in lowered:
+                continue
+            for match in fmt.regex.finditer(lowered):
+                gene_start, gene_end = match.span("gene")
+                ct_start, ct_end = match.span("ct")
+                ct = text[ct_start:ct_end] if ct_start >= 0 else None
+                yield text[gene_start:gene_end], ct
+
+    def parse(self, text):
+        lowered = self._fold(text)
+        disease_match = DISEASE_RE.search(lowered)
+        result_match = RESULT_RE.search(lowered)
+
+        ct_values = {}
+        # Formats run in registration order, so a later format wins on the same gene
+        for gene, value in self._ct_matches(text, lowered):
+            if value:
+                ct_values[gene.strip()] = value
+
+        return {
+            "disease": text[disease_match.start():disease_match.end()] if disease_match else "Unknown",
+            "result": text[result_match.start(1):result_match.end(1)] if result_match else "Unknown",
+            "ct_values": ct_values,
+            "risk_level": ct_to_risk(ct_values),
+        }
+
+    def is_complete(self, text):
+        # Disease, overall result and at least one Ct value present. Later Ct rows are not
+        # waited for, which is why PDF_EARLY_STOP (ocr_jobs.py) is off by default
+        lowered = self._fold(text)
+        if not DISEASE_RE.search(lowered) or not RESULT_RE.search(lowered):
+            return False
+        return any(ct for _, ct in self._ct_matches(text, lowered))
+
+
+default_parser = LabReportParser()
+
+
+def parse_lab_report(text):
+    return default_parser.parse(text)
+
+
+def lab_report_complete(text):
+    return default_parser.is_complete(text)
+
+
+def register_lab_format(lab_format):
+    default_parser.register(lab_format)
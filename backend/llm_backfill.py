@@ -0,0 +1,234 @@
+"""
+Background backfill of missing LLM suggestions.
+
+Replaces the inline backfill that used to run inside GET /reports. A single
+daemon thread walks reports whose ``llm_suggestion`` is missing or "N/A" in
+``_id`` order, in batches, and hands each one to the shared LLMJobQueue.
+Reports are claimed with a conditional update before being queued so two
+workers never generate the same suggestion, submissions are paced by a
+calls-per-minute limit, and the position of the last finished report is
+persisted so a restart resumes where it stopped.
+
+Reports whose LLM job failed are not covered by the cursor: every pass
+also retries failed reports whose ``llm_retry_at`` has passed, until they
+have used ``max_attempts`` attempts (the job queue doubles the delay after
+each failure). ``trigger()`` asks the service thread for a pass right away.
+"""
+import datetime
+import threading
+import time
+
+from llm_jobs import LLM_PENDING, STATUS_FAILED, STATUS_PENDING, build_llm_prompt
+
+BACKFILL_STATE_ID = "llm_backfill"
+MISSING_SUGGESTION_QUERY = {"$or": [{"llm_suggestion": "N/A"}, {"llm_suggestion": {"$exists": False}}]}
+REPORT_PROMPT_FIELDS = {
+    "matched_symptoms": 1, "disease": 1, "risk_level": 1, "confidence": 1, "llm_suggestion": 1,
+    "llm_attempts": 1, "llm_retry_at": 1
+}
+
+
+class LLMBackfillService:
+    def __init__(self, reports_collection, state_collection, job_queue, batch_size=20,
+                 rate_per_minute=30, interval=30.0, stale_after=600.0, max_attempts=5):
+        self.reports_collection = reports_collection
+        self.state_collection = state_collection
+        self.job_queue = job_queue
+        self.batch_size = batch_size
+        self.min_gap = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.interval = interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.processed = 0
+        self.retried = 0
+        self._last_submit = 0.0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread = None
+
+    # ---------------- Cursor ----------------
+    def get_cursor(self):
+        state = self.state_collection.find_one({"_id": BACKFILL_STATE_ID})
+        return state.get("last_id") if state else None
+
+    def _save_cursor(self, last_id):
+        self.state_collection.update_one(
+            {"_id": BACKFILL_STATE_ID},
+            {"$set": {"last_id": last_id, "updated_at": datetime.datetime.utcnow()}},
+            upsert=True
+        )
+
+    # ---------------- Work ----------------
+    def _claim(self, report, condition):
+        # Conditional update: only one worker can move a report from "missing" / "failed" to "pending"
+        result = self.reports_collection.update_one(
+            {"_id": report["_id"], **condition},
+            {"$set": {
+                "llm_suggestion": LLM_PENDING,
+                "llm_status": STATUS_PENDING,
+                "llm_claimed_at": datetime.datetime.utcnow()
+            }}
+        )
+        return result.modified_count == 1
+
+    def _throttle(self):
+        wait = self._last_submit + self.min_gap - time.monotonic()
+        if wait > 0:
+            self._stop.wait(wait)
+        self._last_submit = time.monotonic()
+
+    def _submit(self, report):
+        self._throttle()
+        prompt = build_llm_prompt(
+            report.get("matched_symptoms", []),
+            report.get("disease"),
+            report.get("risk_level"),
+            report.get("confidence", 0)
+        )
+        return self.job_queue.submit(report["_id"], prompt, attempt=report.get("llm_attempts", 0))
+
+    @staticmethod
+    def _wait(futures):
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ LLM backfill job failed: {e}")
+
+    def requeue_stale(self):
+        # Pending claims left behind by a worker that died are released and the cursor rewound to them
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.stale_after)
+        stale = list(self.reports_collection.find(
+            {"llm_status": STATUS_PENDING, "$or": [
+                {"llm_claimed_at": {"$lt": cutoff}},
+                {"llm_claimed_at": {"$exists": False}, "created_at": {"$lt": cutoff}}
+            ]},
+            {"_id": 1}
+        ).sort("_id", 1))
+        if not stale:
+            return 0
+        stale_ids = [r["_id"] for r in stale if not self.job_queue.is_pending(r["_id"])]
+        if not stale_ids:
+            return 0
+        self.reports_collection.update_many(
+            {"_id": {"$in": stale_ids}},
+            {"$set": {"llm_suggestion": "N/A"}, "$unset": {"llm_status": "", "llm_claimed_at": ""}}
+        )
+        cursor = self.get_cursor()
+        if cursor is not None and stale_ids[0] <= cursor:
+            self._save_cursor(None)
+        return len(stale_ids)
+
+    def run_batch(self):
+        # Processes one batch; returns the number of reports scanned (0 once caught up)
+        with self._run_lock:
+            query = dict(MISSING_SUGGESTION_QUERY)
+            cursor = self.get_cursor()
+            if cursor is not None:
+                query["_id"] = {"$gt": cursor}
+
+            batch = list(
+                self.reports_collection.find(query, REPORT_PROMPT_FIELDS).sort("_id", 1).limit(self.batch_size)
+            )
+            if not batch:
+                return 0
+
+            futures = []
+            last_id = cursor
+            for report in batch:
+                if self._stop.is_set():
+                    break
+                last_id = report["_id"]
+                if self._claim(report, MISSING_SUGGESTION_QUERY):
+                    futures.append(self._submit(report))
+
+            # Advance the cursor only once the queued jobs have written their results
+            self._wait(futures)
+            self.processed += len(futures)
+            if last_id is not None:
+                self._save_cursor(last_id)
+            return len(batch)
+
+    def retry_failed(self):
+        # One batch of failed reports that are due for another attempt; returns the number scanned
+        with self._run_lock:
+            batch = list(
+                self.reports_collection.find(
+                    {
+                        "llm_status": STATUS_FAILED,
+                        "llm_attempts": {"$not": {"$gte": self.max_attempts}},
+                        # Failures recorded before retries existed have no llm_retry_at and are due now
+                        "$or": [
+                            {"llm_retry_at": {"$lte": datetime.datetime.utcnow()}},
+                            {"llm_retry_at": {"$exists": False}}
+                        ]
+                    },
+                    REPORT_PROMPT_FIELDS
+                ).sort("_id", 1).limit(self.batch_size)
+            )
+            futures = []
+            for report in batch:
+                if self._stop.is_set():
+                    break
+                condition = {"llm_status": STATUS_FAILED, "llm_retry_at": report.get("llm_retry_at")}
+                if self._claim(report, condition):
+                    futures.append(self._submit(report))
+            self._wait(futures)
+            self.retried += len(futures)
+            return len(batch)
+
+    def run_once(self):
+        # One pass: due retries, then the next batch of missing suggestions; returns reports scanned
+        return self.retry_failed() + self.run_batch()
+
+    # ---------------- Lifecycle ----------------
+    def _loop(self):
+        try:
+            self.requeue_stale()
+        except Exception as e:
+            print(f"⚠️ LLM backfill could not requeue stale claims: {e}")
+        while not self._stop.is_set():
+            try:
+                scanned = self.run_once()
+            except Exception as e:
+                print(f"⚠️ LLM backfill batch failed: {e}")
+                scanned = 0
+            if scanned == 0:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def _run_triggered(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            print(f"⚠️ LLM backfill batch failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="llm-backfill", daemon=True)
+            self._thread.start()
+
+    def trigger(self):
+        # Runs a pass in the background: wakes the service thread, or a one-off thread when it is not running
+        if self._thread is not None and self._thread.is_alive():
+            self._wake.set()
+            return
+        threading.Thread(target=self._run_triggered, name="llm-backfill-once", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def status(self):
+        cursor = self.get_cursor()
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "cursor": str(cursor) if cursor is not None else None,
+            "processed": self.processed,
+            "retried": self.retried,
+            "max_attempts": self.max_attempts,
+            "batch_size": self.batch_size,
+            "rate_per_minute": round(60.0 / self.min_gap, 2) if self.min_gap else None
+        }
@@ -0,0 +1,129 @@
+"""
+Background LLM suggestion jobs.
+
+Reports are saved with ``llm_suggestion`` set to ``LLM_PENDING`` and the
+OpenAI call runs on a bounded thread pool. Each call gets a per-request
+timeout and a few retries with exponential backoff; the result (or a
+failure message) is written back to the report document. A failed job
+counts one attempt on the report and sets ``llm_retry_at``, so the
+backfill service can try it again later with a growing delay.
+"""
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+
+from tracing import stage, trace
+
+LLM_PENDING = "Pending"
+LLM_MODEL = "gpt-4o-mini"
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def build_llm_prompt(matched_symptoms, disease, risk_level, confidence):
+    return f"""
+        You are an AI medical assistant specialized in zoonotic diseases.
+        Patient shows symptoms: {', '.join(matched_symptoms) if matched_symptoms else 'No major symptoms reported'}.
+        Detected disease: {disease}.
+        Risk level: {risk_level}.
+        Confidence: {confidence}%.
+        Provide 3 safe and helpful health suggestions (avoid medication or prescriptions).
+        """
+
+
+def generate_llm_suggestion(llm_client, prompt, timeout=None):
+    kwargs = {}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    llm_response = llm_client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=200,
+        **kwargs
+    )
+    return llm_response.choices[0].message.content.strip()
+
+
+class LLMJobQueue:
+    def __init__(self, llm_client, reports_collection, max_workers=4, timeout=20.0,
+                 max_retries=2, backoff=1.0, retry_after=300.0):
+        self.llm_client = llm_client
+        self.reports_collection = reports_collection
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Delay before a failed report may be retried; doubles with every failed attempt
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-job")
+        self._cond = threading.Condition()
+        self._inflight = {}  # report_id -> Future
+
+    def submit(self, report_id, prompt, attempt=0):
+        # attempt: failed jobs already recorded on the report (0 for a new report)
+        report_id = str(report_id)
+        with self._cond:
+            future = self._inflight.get(report_id)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._run, report_id, prompt, attempt)
+            self._inflight[report_id] = future
+        return future
+
+    def is_pending(self, report_id):
+        with self._cond:
+            return str(report_id) in self._inflight
+
+    def wait(self, report_id, timeout):
+        # Blocks until the job for report_id finishes here or timeout elapses; True if no longer in flight
+        report_id = str(report_id)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while report_id in self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _call_with_retries(self, prompt):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                with stage("openai"):
+                    return generate_llm_suggestion(self.llm_client, prompt, timeout=self.timeout)
+            except Exception as e:
+                last_error = e
+                print(f"❌ LLM job attempt {attempt + 1}/{self.max_retries + 1} failed: {e}")
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+        raise last_error
+
+    def _run(self, report_id, prompt, attempt=0):
+        try:
+            with trace("llm_job"):
+                try:
+                    llm_suggestion = self._call_with_retries(prompt)
+                    update = {"$set": {"llm_suggestion": llm_suggestion, "llm_status": STATUS_DONE},
+                              "$unset": {"llm_retry_at": ""}}
+                except Exception:
+                    llm_suggestion = "LLM suggestion unavailable due to API error."
+                    retry_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.retry_after * 2 ** attempt)
+                    update = {"$set": {"llm_suggestion": llm_suggestion, "llm_status": STATUS_FAILED,
+                                       "llm_attempts": attempt + 1, "llm_retry_at": retry_at}}
+
+                with stage("save_report"):
+                    self.reports_collection.update_one({"_id": ObjectId(report_id)}, update)
+            return llm_suggestion
+        finally:
+            with self._cond:
+                self._inflight.pop(report_id, None)
+                self._cond.notify_all()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,207 @@
+"""
+Versioned model bundles.
+
+A bundle is a directory holding the native XGBoost booster in UBJSON
+(``model.ubj``) and a ``manifest.json`` with the feature order, class names,
+training metadata and the SHA-256 of the booster file. Loading needs only
+xgboost: no joblib, no sklearn wrappers, no pickles. Bundles live under a
+models root, one directory per version, and ``LATEST`` names the one the
+server loads:
+
+    models/
+        LATEST                  -> "20251015120000"
+        20251015120000/
+            manifest.json
+            model.ubj
+
+Export the current pickles once with:
+
+    python model_bundle.py --from-pickle xgboost_disease_model.pkl label_encoder.pkl
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+BUNDLE_FORMAT = 1
+MODEL_FILE = "model.ubj"
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+DEFAULT_MODELS_DIR = "models"
+
+
+class BundleError(Exception):
+    pass
+
+
+class ModelBundle:
+    def __init__(self, booster, feature_names, class_names, manifest, path):
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self.class_names = list(class_names)
+        self.manifest = manifest
+        self.path = path
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ---------------- Export ----------------
+def save_bundle(booster, feature_names, class_names, models_dir=DEFAULT_MODELS_DIR, metadata=None,
+                version=None, make_latest=True):
+    # Writes models_dir/<version>/ and (optionally) points LATEST at it; returns the bundle path
+    import xgboost as xgb
+
+    feature_names = [str(f) for f in feature_names]
+    class_names = [str(c) for c in class_names]
+    if booster.num_features() != len(feature_names):
+        raise BundleError(f"Booster expects {booster.num_features()} features, got {len(feature_names)} names")
+
+    version = version or datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    model_bytes = bytes(booster.save_raw(raw_format="ubj"))
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "model_file": MODEL_FILE,
+        "sha256": _sha256(model_bytes),
+        "feature_names": feature_names,
+        "class_names": class_names,
+        "xgboost_version": xgb.__version__,
+        "metadata": metadata or {},
+    }
+
+    os.makedirs(models_dir, exist_ok=True)
+    final_path = os.path.join(models_dir, version)
+    if os.path.exists(final_path):
+        raise BundleError(f"Bundle version {version} already exists in {models_dir}")
+
+    # Build in a temp dir next to the target, then rename: readers never see a half-written bundle
+    tmp_path = tempfile.mkdtemp(prefix=f".{version}-", dir=models_dir)
+    try:
+        os.chmod(tmp_path, 0o755)  # mkdtemp creates 0700
+        with open(os.path.join(tmp_path, MODEL_FILE), "wb") as f:
+            f.write(model_bytes)
+        with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, final_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    if make_latest:
+        _write_atomic(os.path.join(models_dir, LATEST_FILE), version + "\n")
+    return final_path
+
+
+# ---------------- Load ----------------
+def read_latest(models_dir):
+    # Version named by models_dir/LATEST, or None when there is none
+    try:
+        with open(os.path.join(models_dir, LATEST_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_bundle_path(path, version=None):
+    # Accepts a bundle directory, or a models root (uses `version` or LATEST)
+    if os.path.isfile(os.path.join(path, MANIFEST_FILE)) and version is None:
+        return path
+    if version is None:
+        version = read_latest(path)
+        if version is None:
+            raise BundleError(f"No {MANIFEST_FILE} or {LATEST_FILE} in {path}")
+    bundle_path = os.path.join(path, version)
+    if not os.path.isfile(os.path.join(bundle_path, MANIFEST_FILE)):
+        raise BundleError(f"Bundle {version} not found in {path}")
+    return bundle_path
+
+
+def load_bundle(path, version=None):
+    import xgboost as xgb
+
+    bundle_path = resolve_bundle_path(path, version)
+    with open(os.path.join(bundle_path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')} in {bundle_path}")
+
+    # Hash and load the same bytes, so the file cannot change between the check and the load
+    with open(os.path.join(bundle_path, manifest.get("model_file", MODEL_FILE)), "rb") as f:
+        model_bytes = f.read()
+    if _sha256(model_bytes) != manifest["sha256"]:
+        raise BundleError(f"Checksum mismatch for {bundle_path}: model file does not match its manifest")
+
+    booster = xgb.Booster()
+    booster.load_model(bytearray(model_bytes))
+    if booster.num_features() != len(manifest["feature_names"]):
+        raise BundleError(
+            f"Bundle {manifest['version']}: booster has {booster.num_features()} features, "
+            f"manifest lists {len(manifest['feature_names'])}"
+        )
+    return ModelBundle(booster, manifest["feature_names"], manifest["class_names"], manifest, bundle_path)
+
+
+def list_bundles(models_dir=DEFAULT_MODELS_DIR):
+    if not os.path.isdir(models_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(models_dir)
+        if not name.startswith(".") and os.path.isfile(os.path.join(models_dir, name, MANIFEST_FILE))
+    )
+
+
+# ---------------- Pickle migration ----------------
+def export_from_pickle(model_path, encoder_path, models_dir=DEFAULT_MODELS_DIR, version=None):
+    import joblib
+
+    model = joblib.load(model_path)
+    label_encoder = joblib.load(encoder_path)
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    if not booster.feature_names:
+        raise BundleError(f"{model_path} has no feature names; export it from train_xgboost.py instead")
+    return save_bundle(
+        booster, booster.feature_names, label_encoder.classes_, models_dir,
+        metadata={"source": f"converted from {os.path.basename(model_path)} + {os.path.basename(encoder_path)}"},
+        version=version
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect XGBoost model bundles.")
+    parser.add_argument("--from-pickle", nargs=2, metavar=("MODEL_PKL", "ENCODER_PKL"),
+                        help="convert a joblib XGBClassifier + LabelEncoder into a bundle")
+    parser.add_argument("--models-dir", default=os.getenv("MODEL_BUNDLE_DIR", DEFAULT_MODELS_DIR))
+    parser.add_argument("--version", help="bundle version (default: UTC timestamp)")
+    parser.add_argument("--verify", action="store_true", help="load LATEST (or --version) and check its checksum")
+    args = parser.parse_args()
+
+    if args.from_pickle:
+        path = export_from_pickle(*args.from_pickle, models_dir=args.models_dir, version=args.version)
+        print(f"✅ Wrote bundle {path}")
+    if args.verify or not args.from_pickle:
+        bundle = load_bundle(args.models_dir, args.version)
+        print(f"✅ {bundle.path}: version {bundle.version}, {len(bundle.feature_names)} features, "
+              f"classes {bundle.class_names}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
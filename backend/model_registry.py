@@ -0,0 +1,224 @@
+"""
+Model registry: several model versions loaded side by side.
+
+One version is *active*; optionally a *candidate* gets a configurable share
+of prediction traffic (A/B). Routing reads a single immutable snapshot, so
+swapping the active model (admin call, or a change of models/LATEST picked
+up by the watcher thread) is atomic and never interrupts requests already
+running on the previous engine. Requests with a user id are routed
+stickily, so one patient consistently sees the same model; requests
+without one are routed at random. Up to ``max_loaded`` versions stay
+loaded; loading one more unloads the least recently used version that
+is not serving traffic, so repeated hot swaps never fill the registry.
+Per-version stats survive that eviction (the comparison behind a
+promotion stays visible) and are dropped only by an explicit unload().
+
+Every prediction is recorded per version: request count, latency window
+(p50/p95/max) and the distribution of predicted diseases. A one-line
+summary per version is printed every ``log_every`` predictions. Each loaded
+engine carries its own prediction cache, reported per version by status().
+"""
+import hashlib
+import random
+import threading
+from collections import Counter, OrderedDict, deque
+
+LATENCY_WINDOW = 1000
+
+
+class _VersionStats:
+    def __init__(self):
+        self.requests = 0
+        self.predictions = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.diseases = Counter()
+
+    def summary(self):
+        ordered = sorted(self.latencies)
+
+        def pct(fraction):
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3) if ordered else None
+
+        return {
+            "requests": self.requests,
+            "predictions": self.predictions,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0), "window": len(ordered)},
+            "diseases": dict(self.diseases.most_common()),
+        }
+
+
+class _Routing:
+    # Immutable snapshot of who serves traffic
+    def __init__(self, active, candidate=None, share=0.0):
+        self.active = active
+        self.candidate = candidate
+        self.share = share if candidate is not None else 0.0
+
+
+class ModelRegistry:
+    def __init__(self, load_engine, latest_version=None, max_loaded=4, log_every=500):
+        # load_engine(version or None) -> engine with .version; latest_version() -> version LATEST names, or None
+        self._load_engine = load_engine
+        self._latest_version = latest_version
+        self.max_loaded = max_loaded
+        self.log_every = log_every
+        self._engines = OrderedDict()  # least recently used first
+        self._routing = None
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self._watched_version = None
+
+    # ---------------- Loading / swapping ----------------
+    def load(self, version=None):
+        # Loads (or returns the already loaded) engine for version; None means LATEST
+        if version is None and self._latest_version is not None:
+            version = self._latest_version()
+        if version is not None:
+            with self._lock:
+                existing = self._engines.get(version)
+                if existing is not None:
+                    self._engines.move_to_end(version)
+                    return existing
+        engine = self._load_engine(version)
+        with self._lock:
+            existing = self._engines.get(engine.version)
+            if existing is not None:
+                self._engines.move_to_end(engine.version)
+                return existing
+            evicted = self._evict_lru()
+            self._engines[engine.version] = engine
+        if evicted:
+            print(f"💡 Unloaded least recently used model version: {evicted}")
+        return engine
+
+    def _evict_lru(self):
+        # Makes room for one more engine; caller holds self._lock. Requests still running on an
+        # evicted engine hold their own reference; its stats stay until unload()
+        if len(self._engines) < self.max_loaded:
+            return None
+        serving = self._serving()
+        for version in self._engines:
+            if version not in serving:
+                del self._engines[version]
+                return version
+        raise ValueError(f"{self.max_loaded} model versions loaded and all serving traffic; raise max_loaded")
+
+    def activate(self, version=None):
+        # Returns (new, previous) active versions
+        engine = self.load(version)
+        with self._lock:
+            previous = self._routing.active.version if self._routing else None
+            routing = self._routing
+            candidate, share = (routing.candidate, routing.share) if routing else (None, 0.0)
+            if candidate is not None and candidate.version == engine.version:
+                # Promoting the candidate ends the experiment
+                candidate, share = None, 0.0
+            self._routing = _Routing(engine, candidate, share)
+        print(f"✅ Active model: {engine.version} (was {previous})")
+        return engine.version, previous
+
+    def set_candidate(self, version, share):
+        # version=None or share=0 ends the experiment
+        if not 0.0 <= share <= 1.0:
+            raise ValueError("share must be between 0 and 1")
+        engine = self.load(version) if version is not None and share > 0 else None
+        with self._lock:
+            if self._routing is None:
+                raise ValueError("No active model yet")
+            if engine is not None and engine.version == self._routing.active.version:
+                raise ValueError(f"{engine.version} is already the active model")
+            self._routing = _Routing(self._routing.active, engine, share)
+        return engine.version if engine is not None else None
+
+    def _serving(self):
+        # Engines the current routing sends traffic to; caller holds self._lock
+        routing = self._routing
+        if routing is None:
+            return {}
+        serving = {routing.active.version: routing.active}
+        if routing.candidate is not None:
+            serving[routing.candidate.version] = routing.candidate
+        return serving
+
+    def unload(self, version):
+        with self._lock:
+            if version in self._serving():
+                raise ValueError(f"{version} is serving traffic; activate another version or clear the candidate first")
+            if self._engines.pop(version, None) is None:
+                raise KeyError(version)
+        with self._stats_lock:
+            self._stats.pop(version, None)
+
+    # ---------------- Serving ----------------
+    @property
+    def ready(self):
+        return self._routing is not None
+
+    def choose(self, routing_key=None):
+        routing = self._routing
+        if routing is None:
+            return None
+        if routing.candidate is None:
+            return routing.active
+        if routing_key:
+            # Sticky: the same user always lands in the same bucket
+            bucket = int(hashlib.md5(str(routing_key).encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+        else:
+            bucket = random.random()
+        return routing.candidate if bucket < routing.share else routing.active
+
+    def record(self, version, seconds, diseases):
+        with self._stats_lock:
+            stats = self._stats.setdefault(version, _VersionStats())
+            stats.requests += 1
+            stats.predictions += len(diseases)
+            stats.latencies.append(seconds)
+            stats.diseases.update(diseases)
+            should_log = self.log_every and stats.requests % self.log_every == 0
+            summary = stats.summary() if should_log else None
+        if summary is not None:
+            print(f"📊 Model {version}: {summary['requests']} requests, latency {summary['latency_ms']}, "
+                  f"diseases {summary['diseases']}")
+
+    # ---------------- File watcher ----------------
+    def start_watcher(self, interval):
+        # Polls LATEST and activates the version it names when it changes
+        if self._watcher is not None or not interval or self._latest_version is None:
+            return
+        self._watched_version = self._routing.active.version if self._routing else None
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            latest = None
+            try:
+                latest = self._latest_version()
+                if latest and latest != self._watched_version:
+                    self._watched_version = latest
+                    self.activate(latest)
+            except Exception as e:
+                print(f"❌ Model watcher could not activate {latest}: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        routing = self._routing
+        with self._stats_lock:
+            stats = {version: s.summary() for version, s in self._stats.items()}
+        return {
+            "active": routing.active.version if routing else None,
+            "candidate": routing.candidate.version if routing and routing.candidate else None,
+            "candidate_share": routing.share if routing else 0.0,
+            "loaded": sorted(self._engines),
+            "watching": self._watcher is not None,
+            "stats": stats,
+            "prediction_cache": {
+                version: engine.cache_stats()
+                for version, engine in list(self._engines.items()) if hasattr(engine, "cache_stats")
+            },
+        }
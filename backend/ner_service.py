@@ -0,0 +1,191 @@
+"""
+Batched, cached CPU NER service.
+
+The token-classification pipeline (BioBERT NER by default) is loaded once
+from a local directory - ``local_files_only``, so it works offline - in one
+of three CPU modes:
+
+  * ``torch``       - the plain PyTorch model
+  * ``torch-int8``  - dynamic int8 quantization of the Linear layers
+  * ``onnx``        - ONNX Runtime via optimum (uses model.onnx in the model
+                      directory, or exports one on first load)
+
+Callers on any thread submit texts; one batcher thread groups whatever
+arrives within ``max_wait_ms`` (up to ``max_batch`` texts) into a single
+pipeline call. The pipeline sees each text exactly as submitted, so the
+returned ``start``/``end`` offsets index into the caller's string; results
+are cached per exact text, and identical texts already in flight share one
+future. A failing batch fails only its own futures; the batcher keeps
+running.
+
+Get the model once with:
+
+    huggingface-cli download d4data/biobert_ner --local-dir models/ner/biobert_ner
+"""
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+NER_BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def load_ner_pipeline(model_path, backend="torch", num_threads=None):
+    if backend not in NER_BACKENDS:
+        raise ValueError(f"Unknown NER backend '{backend}'; expected one of {NER_BACKENDS}")
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForTokenClassification
+
+        exported = os.path.isfile(os.path.join(model_path, "model.onnx"))
+        model = ORTModelForTokenClassification.from_pretrained(model_path, export=not exported, local_files_only=True)
+    else:
+        model = AutoModelForTokenClassification.from_pretrained(model_path, local_files_only=True)
+        model.eval()
+        if backend == "torch-int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple", device=-1)
+
+
+class NERService:
+    def __init__(self, ner_pipeline, max_batch=16, max_wait_ms=10, cache_size=2048):
+        self.ner_pipeline = ner_pipeline
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._inflight = {}  # text -> Future
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+        self.requests = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.pipeline_seconds = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ner-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+
+    # ---------------- Submitting ----------------
+    def submit(self, text):
+        # Future resolving to [{"word", "entity_group", "score", "start", "end"}]; offsets index into text
+        key = text
+        with self._lock:
+            self.requests += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self._inflight.get(key)
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+                self._queue.put(key)
+        return future
+
+    def extract(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def extract_many(self, texts, timeout=None):
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    # ---------------- Batching ----------------
+    def _next_batch(self):
+        key = self._queue.get()
+        if key is None:
+            return None
+        batch = [key]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                key = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if key is None:
+                self._queue.put(None)
+                break
+            batch.append(key)
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch is None:
+                break
+            start = time.perf_counter()
+            try:
+                results, error = self._process(batch), None
+            except Exception as e:
+                # Fails this batch's callers only; the batcher thread keeps serving
+                print(f"⚠️ NER batch of {len(batch)} failed: {e}")
+                results, error = None, e
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.batches += 1
+                self.batched_texts += len(batch)
+                self.pipeline_seconds += elapsed
+                futures = [self._inflight.pop(key) for key in batch]
+                if error is None:
+                    for key, entities in zip(batch, results):
+                        self._cache[key] = entities
+                        self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            for i, future in enumerate(futures):
+                if error is None:
+                    future.set_result(results[i])
+                else:
+                    future.set_exception(error)
+
+    def _process(self, batch):
+        outputs = self.ner_pipeline(batch, batch_size=len(batch))
+        if len(batch) == 1 and (not outputs or isinstance(outputs[0], dict)):
+            outputs = [outputs]  # some pipeline versions unwrap a one-text batch ([] when it has no entities)
+        if len(outputs) != len(batch):
+            raise ValueError(f"NER pipeline returned {len(outputs)} results for {len(batch)} texts")
+        return [self._clean(entities) for entities in outputs]
+
+    @staticmethod
+    def _clean(entities):
+        # numpy scalars -> plain JSON types
+        return [
+            {"word": e["word"], "entity_group": e.get("entity_group"), "score": round(float(e["score"]), 4),
+             "start": int(e["start"]) if e.get("start") is not None else None,
+             "end": int(e["end"]) if e.get("end") is not None else None}
+            for e in entities
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "cache_entries": len(self._cache),
+                "batches": self.batches,
+                "avg_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+                "avg_batch_ms": round(self.pipeline_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "queued": self._queue.qsize()
+            }
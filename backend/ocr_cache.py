@@ -0,0 +1,85 @@
+"""
+Content-addressed cache for OCR / parse results.
+
+Keyed by the SHA-256 of the uploaded bytes, so re-uploading the same PDF or
+image skips extraction entirely. A bounded in-memory LRU sits in front of an
+optional Mongo collection that survives restarts and is shared between API
+workers.
+"""
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class OCRResultCache:
+    def __init__(self, max_entries=256, collection=None):
+        self.max_entries = max_entries
+        self.collection = collection
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, parsed):
+        with self._lock:
+            self._entries[key] = parsed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return dict(parsed)
+
+        if self.collection is not None:
+            doc = self.collection.find_one({"_id": key})
+            if doc is not None:
+                parsed = doc["parsed"]
+                self._remember(key, parsed)
+                with self._lock:
+                    self.persistent_hits += 1
+                return dict(parsed)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, parsed):
+        self._remember(key, dict(parsed))
+        if self.collection is not None:
+            self.collection.update_one(
+                {"_id": key},
+                {"$set": {"parsed": parsed, "updated_at": datetime.datetime.utcnow()}},
+                upsert=True
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.collection is not None:
+            self.collection.delete_many({})
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self.collection is not None,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,175 @@
+"""
+OCR / lab-report parsing on a process pool.
+
+/upload hands the raw file bytes to ``OCRJobManager.submit`` and returns a
+job id straight away. Text extraction (PyMuPDF or tesseract) and parsing run
+in a spawn-based process pool sized to the machine's cores, from in-memory
+buffers, so concurrent uploads never share a path on disk. Job state lives
+in Mongo so any API worker can answer a status poll.
+
+Results are written back on a small thread pool, not on the process pool's
+callback thread. If a worker process dies, the pool is rebuilt and the jobs
+it was running are marked failed instead of staying "queued".
+"""
+import datetime
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from lab_report_parser import parse_lab_report, lab_report_complete
+from ocr_cache import content_hash
+from pdf_ingest import extract_pdf_text, ocr_image
+from tracing import observe_stage, stage, trace
+
+JOB_QUEUED = "queued"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Read in each pool process; pages per window, OCR'd concurrently when they have no text layer
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", "4"))
+# Opt-in: skip later pages once the first Ct value is found. Ct rows on those pages are then
+# missing from ct_values / risk_level, so only enable it for labs that put every Ct on one page
+PDF_EARLY_STOP = os.getenv("PDF_EARLY_STOP", "0") == "1"
+
+
+# ---------------- Worker-side (runs in the pool) ----------------
+def extract_text(data, filename):
+    if filename.lower().endswith(".pdf"):
+        return extract_pdf_text(
+            data,
+            workers=PDF_PAGE_WORKERS,
+            is_complete=lab_report_complete if PDF_EARLY_STOP else None
+        )
+
+    from PIL import Image
+    with Image.open(BytesIO(data)) as image:
+        return ocr_image(image)
+
+
+def process_upload(data, filename):
+    # Returns (parsed, stage timings); timings are recorded in the API process
+    started = time.perf_counter()
+    text = extract_text(data, filename)
+    extracted = time.perf_counter()
+    parsed = parse_lab_report(text)
+    parsed["text"] = text
+    return parsed, {"ocr": extracted - started, "regex": time.perf_counter() - extracted}
+
+
+# ---------------- API-side ----------------
+class OCRJobManager:
+    def __init__(self, jobs_collection, on_complete, max_workers=None, cache=None):
+        # on_complete(job_doc, parsed) -> response payload stored as the job result
+        self.jobs_collection = jobs_collection
+        self.on_complete = on_complete
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self._executor = None
+        self._lock = threading.Lock()
+        # Mongo writes for finished jobs; done-callbacks run on the pool's management thread
+        self._completer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ocr-complete")
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process runs background threads, which fork() would not copy safely
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_pool(self, executor):
+        # A worker died: drop the broken pool (its pending futures fail with BrokenProcessPool)
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("⚠️ OCR process pool broke; starting a new one")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_work(self, data, filename):
+        # Returns (executor, future); a pool found broken at submit time is replaced once
+        executor = self._pool()
+        try:
+            return executor, executor.submit(process_upload, data, filename)
+        except BrokenProcessPool:
+            self._discard_pool(executor)
+            executor = self._pool()
+            return executor, executor.submit(process_upload, data, filename)
+
+    def submit(self, data, filename, user_id):
+        # Returns the job document; it is already "done" when the file's content hash was cached
+        with stage("cache_lookup"):
+            key = content_hash(data) if self.cache is not None else None
+            cached = self.cache.get(key) if key else None
+
+        job_id = uuid.uuid4().hex
+        job_doc = {
+            "_id": job_id,
+            "status": JOB_QUEUED,
+            "user_id": user_id,
+            "filename": filename,
+            "content_hash": key,
+            "cached": cached is not None,
+            "created_at": datetime.datetime.utcnow()
+        }
+        with stage("mongo"):
+            self.jobs_collection.insert_one(job_doc)
+
+        if cached is not None:
+            # Repeat upload: skip OCR entirely
+            with stage("save_report"):
+                return {**job_doc, **self._complete(job_doc, cached)}
+
+        try:
+            with stage("submit"):
+                executor, future = self._submit_work(data, filename)
+        except Exception as e:
+            return {**job_doc, **self._complete(job_doc, error=e)}
+        future.add_done_callback(lambda f: self._completer.submit(self._finish, job_doc, f, executor))
+        return job_doc
+
+    def _finish(self, job_doc, future, executor):
+        try:
+            parsed, timings = future.result()
+        except BrokenProcessPool as e:
+            self._discard_pool(executor)
+            self._complete(job_doc, error=e)
+            return
+        except Exception as e:
+            self._complete(job_doc, error=e)
+            return
+        for name, seconds in timings.items():
+            observe_stage("upload_job", name, seconds)
+        if self.cache is not None and job_doc["content_hash"]:
+            self.cache.put(job_doc["content_hash"], parsed)
+        with trace("upload_job"), stage("save_report"):
+            self._complete(job_doc, parsed)
+
+    def _complete(self, job_doc, parsed=None, error=None):
+        if error is None:
+            try:
+                result = self.on_complete(job_doc, parsed)
+                update = {"status": JOB_DONE, "result": result, "report_id": result.get("_id")}
+            except Exception as e:
+                error = e
+        if error is not None:
+            print(f"❌ Upload job {job_doc['_id']} failed: {error}")
+            update = {"status": JOB_FAILED, "error": str(error)}
+        update["finished_at"] = datetime.datetime.utcnow()
+        self.jobs_collection.update_one({"_id": job_doc["_id"]}, {"$set": update})
+        return update
+
+    def get(self, job_id):
+        return self.jobs_collection.find_one({"_id": job_id})
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        self._completer.shutdown(wait=wait)
@@ -0,0 +1,161 @@
+"""
+Bulk PDF export: many reports in one download.
+
+Report documents are turned into template sections in the API process
+(cheap), and only the PDF render is shipped to a spawn-based process pool.
+Each pool process builds one ``ReportPDFRenderer`` (same backend as the
+API's) in its initializer, so the compiled template, parsed styles and
+downscaled logo are shared by every document that process renders. PDFs already in the single-report
+cache are reused as-is and new renders are added to it.
+
+Output is either a ZIP streamed entry by entry as renders finish (in
+order), or a single merged PDF built with PyMuPDF; the merge de-duplicates
+identical objects, so the logo and fonts are stored once instead of once
+per report. Reports whose render failed are listed in errors.txt (ZIP) or
+on a final page (merged PDF), and returned to the caller. A pool broken by
+a dead worker is replaced on the next render.
+"""
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import RawIOBase
+
+from pdf_renderer import ReportPDFRenderer
+
+_worker_renderer = None
+
+
+# ---------------- Worker-side (runs in the pool) ----------------
+def _init_worker(static_dir, backend):
+    global _worker_renderer
+    _worker_renderer = ReportPDFRenderer(static_dir, backend=backend)
+    # Prepare the shared assets up front instead of inside the first render
+    _worker_renderer.warm_up()
+
+
+def render_sections(sections):
+    return _worker_renderer.render_sections(sections)
+
+
+# ---------------- API-side ----------------
+class _ChunkWriter(RawIOBase):
+    # Unseekable sink for zipfile: collects written bytes until the generator drains them
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BulkPDFExporter:
+    def __init__(self, renderer, max_workers=None):
+        self.renderer = renderer
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process runs background threads, which fork() would not copy safely
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.renderer.assets.static_dir, self.renderer.backend)
+                )
+            return self._executor
+
+    def _discard_pool(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("⚠️ Bulk PDF process pool broke; starting a new one")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, sections):
+        # Returns (executor, future); a pool found broken at submit time is replaced once
+        executor = self._pool()
+        try:
+            return executor, executor.submit(render_sections, sections)
+        except BrokenProcessPool:
+            self._discard_pool(executor)
+            executor = self._pool()
+            return executor, executor.submit(render_sections, sections)
+
+    def render_all(self, jobs):
+        # jobs: [(report_doc, sections)]; yields (report_doc, pdf_bytes or exception) in input order
+        cache = self.renderer.cache
+        pending = []
+        for report_doc, sections in jobs:
+            key = self.renderer.cache_key(report_doc) if cache is not None else None
+            pdf = cache.get(key) if key else None
+            executor, future = (None, None) if pdf is not None else self._submit(sections)
+            pending.append((report_doc, key, pdf, executor, future))
+
+        for report_doc, key, pdf, executor, future in pending:
+            if future is not None:
+                try:
+                    pdf = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard_pool(executor)
+                    print(f"❌ Bulk PDF render failed for {report_doc['_id']}: {e}")
+                    yield report_doc, e
+                    continue
+                if key:
+                    cache.put(key, pdf)
+            yield report_doc, pdf
+
+    def zip_stream(self, jobs):
+        sink = _ChunkWriter()
+        failures = []
+        # PDFs are already compressed; storing them keeps the archive cheap to build
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            for report_doc, pdf in self.render_all(jobs):
+                if isinstance(pdf, Exception):
+                    failures.append(f"{report_doc['_id']}: {pdf}")
+                    continue
+                archive.writestr(f"AI_Report_{report_doc['_id']}.pdf", pdf)
+                yield sink.drain()
+            if failures:
+                archive.writestr("errors.txt", "\n".join(failures) + "\n")
+        yield sink.drain()
+
+    def merged_pdf(self, jobs):
+        # Returns (pdf_bytes or None when nothing rendered, ["<report id>: <error>", ...])
+        import fitz
+        failures = []
+        with fitz.open() as merged:
+            for report_doc, pdf in self.render_all(jobs):
+                if isinstance(pdf, Exception):
+                    failures.append(f"{report_doc['_id']}: {pdf}")
+                    continue
+                with fitz.open(stream=pdf, filetype="pdf") as part:
+                    merged.insert_pdf(part)
+            if merged.page_count == 0:
+                return None, failures
+            if failures:
+                # Same content as errors.txt in the ZIP
+                page = merged.new_page()
+                text = "Reports that could not be rendered:\n\n" + "\n".join(failures)
+                page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36), text, fontsize=9)
+            # garbage=3 merges duplicate objects (logo, fonts) shared by every report
+            return merged.tobytes(garbage=3, deflate=True), failures
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
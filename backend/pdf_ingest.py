@@ -0,0 +1,52 @@
+"""
+PDF ingestion for uploaded lab reports.
+
+Runs inside an OCR pool process. PyMuPDF does not support multithreading
+(not even on separate Document objects), so every page is read and
+rendered on the calling thread, one after another. Only tesseract runs in
+parallel: it is a subprocess fed a PNG, so up to ``workers`` scanned pages
+are OCR'd at once on a small thread pool. Pages are taken in windows of
+``workers``; when ``is_complete`` is given, the text gathered so far is
+checked after each window and the remaining pages are skipped once it
+returns True (opt-in via PDF_EARLY_STOP; the default reads every page).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+OCR_DPI = 300
+OCR_CONFIG = r"--oem 3 --psm 6"
+
+
+def ocr_image(image):
+    import pytesseract
+    return pytesseract.image_to_string(image, config=OCR_CONFIG)
+
+
+def ocr_png(png_bytes):
+    from PIL import Image
+    with Image.open(BytesIO(png_bytes)) as image:
+        return ocr_image(image)
+
+
+def read_page(doc, page_num):
+    # Returns the page's text layer, or PNG bytes to OCR when it has none (scanned page)
+    page = doc.load_page(page_num)
+    text = page.get_text()
+    if text.strip():
+        return text
+    return page.get_pixmap(dpi=OCR_DPI).tobytes("png")
+
+
+def extract_pdf_text(data, workers=4, is_complete=None):
+    import fitz
+    workers = max(1, workers)
+    pages = []
+    with fitz.open(stream=data, filetype="pdf") as doc, ThreadPoolExecutor(max_workers=workers) as pool:
+        page_count = doc.page_count
+        for start in range(0, page_count, workers):
+            window = [read_page(doc, n) for n in range(start, min(start + workers, page_count))]
+            ocr = {i: pool.submit(ocr_png, page) for i, page in enumerate(window) if isinstance(page, bytes)}
+            pages.extend(ocr[i].result() if i in ocr else page for i, page in enumerate(window))
+            if is_complete is not None and start + workers < page_count and is_complete("".join(pages)):
+                break
+    return "".join(pages)
@@ -0,0 +1,514 @@
+"""
+PDF rendering for /download_report.
+
+Everything that does not depend on the report is prepared once per process:
+the Jinja template is compiled, the stylesheet is parsed by WeasyPrint, and
+the logo is downscaled and inlined as a data URI (no ``file://`` reload of
+the 670 KB original). Rendered PDFs are kept in a byte-bounded LRU, with an
+optional disk tier that is byte-bounded too (least recently used files,
+by mtime, are deleted first), keyed by report id plus a fingerprint of the stored
+document, so a report re-renders only after it changes (e.g. once its LLM
+suggestion arrives).
+
+Two backends lay out the same ``build_report_sections`` output: WeasyPrint
+(HTML/CSS, the original look) and ReportLab (platypus flowables, several
+times cheaper per page; see benchmarks/bench_pdf_renderers.py).
+"""
+import base64
+import datetime
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from bson import json_util
+from jinja2 import Environment
+
+from tracing import stage
+
+LOGO_DISPLAY_PX = 80
+LOGO_RENDER_PX = LOGO_DISPLAY_PX * 2  # 2x for print sharpness
+
+# Stored fields that are not shown in the "Core Report Details" table
+PDF_EXCLUDED_FIELDS = {
+    "_id", "suggestion_full", "risk_level", "risk_probability",
+    "suggestion", "raw_text", "llm_suggestion", "llm_status", "llm_claimed_at",
+    "llm_attempts", "llm_retry_at", "model_version"
+}
+
+REPORT_CSS = """
+@page { size: A4; margin: 1cm; }
+body { font-family: sans-serif; color: #333; }
+.logo { text-align: center; }
+.logo img { width: 80px; height: 80px; margin-bottom: 10px; }
+h1 { color: #0B3954; font-size: 24px; text-align: center; margin-bottom: 5px; }
+h2 { color: #0B3954; font-size: 16px; margin-top: 15px; border-bottom: 1px solid #ccc; padding-bottom: 5px; }
+.subtitle { text-align: center; color: #666; margin-top: 0; margin-bottom: 20px; font-size: 12px; }
+table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: left; font-size: 11px; }
+th { background-color: #0B3954; color: white; }
+td.field { font-weight: bold; }
+.ai-box { border: 1px solid #0B3954; background-color: #E8F1F2; padding: 15px; margin-top: 10px; }
+.llm-box { border: 1px solid #0B5439; background-color: #F0FFF0; padding: 15px; margin-top: 10px; }
+.ai-box p, .llm-box p { margin: 0 0 5px 0; font-weight: bold; }
+.llm-box p.advice { font-weight: normal; }
+.ai-box ul, .llm-box ul { list-style: disc; margin: 5px 0 0 20px; padding: 0; }
+.ai-box li, .llm-box li { margin-bottom: 5px; font-weight: normal; }
+.generated { text-align: right; font-size: 10px; color: #999; margin-top: 40px; }
+"""
+
+REPORT_TEMPLATE = """<html>
+<head><meta charset="utf-8"></head>
+<body>
+    <div class="logo">{% if logo_uri %}<img src="{{ logo_uri }}" alt="Logo">{% else %}<h2>Zoonotic AI</h2>{% endif %}</div>
+    <h1>Zoonotic Disease AI Report</h1>
+    <p class="subtitle">Report ID: {{ report_id }} | Generated by AI-based Detection System</p>
+
+    <h2>Core Report Details</h2>
+    <table>
+        <thead>
+            <tr><th style="width:30%;">Field</th><th>Value</th></tr>
+        </thead>
+        <tbody>
+        {% for label, value in rows %}
+            <tr><td class="field">{{ label }}</td><td>{{ value }}</td></tr>
+        {% endfor %}
+        </tbody>
+    </table>
+
+    <h2>Suggestions</h2>
+
+    <div class="ai-box">
+        <p>AI Based Suggestions:</p>
+        <ul>
+        {% for s in ai_suggestions %}<li>{{ s }}</li>
+        {% else %}<li>No model-based suggestion available.</li>{% endfor %}
+        </ul>
+    </div>
+
+    <div class="llm-box">
+        <p>Health Advice:</p>
+        <p class="advice">{{ llm_suggestion }}</p>
+    </div>
+
+    <p class="generated">Report generated on {{ generated_at }}</p>
+</body>
+</html>
+"""
+
+
+# ---------------- Report sections (shared by every backend) ----------------
+def format_display_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, (dict, list)):
+        return str(value).replace("[", "").replace("]", "").replace("{", "").replace("}", "")
+    return str(value)
+
+
+def build_report_sections(report):
+    # report is a serialize_report() dict; returns the data every renderer lays out
+    llm_suggestion_text = report.get("llm_suggestion", "No AI advice available.")
+    suggestion_data = report.get("suggestion", {})
+
+    if isinstance(suggestion_data, dict) and "AI Suggestion" in suggestion_data:
+        ai_suggestion_list = suggestion_data["AI Suggestion"]
+        if not isinstance(ai_suggestion_list, list):
+            ai_suggestion_list = [str(ai_suggestion_list)]
+    else:
+        summary = report.get("suggestion_summary", "No model-based suggestion available.")
+        if "Advice: " in summary:
+            advice_part = summary.split("Advice: ", 1)[-1]
+            ai_suggestion_list = [s.strip() for s in advice_part.split(",") if s.strip()]
+        else:
+            ai_suggestion_list = [summary]
+
+    rows = [
+        (key.replace("_", " ").capitalize(), format_display_value(value))
+        for key, value in report.items()
+        if key not in PDF_EXCLUDED_FIELDS
+    ]
+    return {
+        "report_id": str(report.get("_id", "")),
+        "rows": rows,
+        "ai_suggestions": ai_suggestion_list,
+        "llm_suggestion": llm_suggestion_text,
+        "generated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def report_fingerprint(report_doc):
+    # Changes whenever any stored field of the report changes
+    return hashlib.sha1(json_util.dumps(report_doc, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ---------------- Shared assets ----------------
+class ReportAssets:
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self.logo_path = os.path.join(static_dir, "logo.png")
+        self._lock = threading.Lock()
+        self._logo_png = None
+        self._logo_uri = None
+        self._stylesheet = None
+        self._template = None
+        self._logo_reader = None
+        self._reportlab_styles = None
+
+    def logo_png(self):
+        # Downscaled PNG bytes of the logo, or None when the file is missing
+        if self._logo_png is None and os.path.exists(self.logo_path):
+            with self._lock:
+                if self._logo_png is None:
+                    from PIL import Image
+                    with Image.open(self.logo_path) as image:
+                        image.thumbnail((LOGO_RENDER_PX, LOGO_RENDER_PX))
+                        buffer = BytesIO()
+                        image.save(buffer, format="PNG", optimize=True)
+                    self._logo_png = buffer.getvalue()
+        return self._logo_png
+
+    def logo_uri(self):
+        if self._logo_uri is None:
+            png = self.logo_png()
+            if png is not None:
+                self._logo_uri = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+        return self._logo_uri
+
+    def stylesheet(self):
+        if self._stylesheet is None:
+            with self._lock:
+                if self._stylesheet is None:
+                    from weasyprint import CSS
+                    self._stylesheet = CSS(string=REPORT_CSS)
+        return self._stylesheet
+
+    def template(self):
+        if self._template is None:
+            self._template = Environment(autoescape=True).from_string(REPORT_TEMPLATE)
+        return self._template
+
+    def logo_reader(self):
+        # Decoded once and drawn directly by every ReportLab render
+        if self._logo_reader is None:
+            png = self.logo_png()
+            if png is not None:
+                from reportlab.lib.utils import ImageReader
+                self._logo_reader = ImageReader(BytesIO(png))
+        return self._logo_reader
+
+    def reportlab_styles(self):
+        if self._reportlab_styles is None:
+            from reportlab import rl_config
+            from reportlab.lib import colors
+            from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+            from reportlab.lib.styles import ParagraphStyle
+
+            # Binary streams instead of ASCII85: the pure-Python encoder dominated render time (logo)
+            rl_config.useA85 = 0
+            # Sizes mirror REPORT_CSS (px * 0.75 = pt)
+            base = ParagraphStyle("base", fontName="Helvetica", fontSize=8.25, leading=10.5,
+                                  textColor=colors.HexColor("#333333"))
+            self._reportlab_styles = {
+                "body": base,
+                "bold": ParagraphStyle("bold", parent=base, fontName="Helvetica-Bold"),
+                "header": ParagraphStyle("header", parent=base, fontName="Helvetica-Bold", textColor=colors.white),
+                "title": ParagraphStyle("title", parent=base, fontName="Helvetica-Bold", fontSize=18, leading=22,
+                                        alignment=TA_CENTER, textColor=colors.HexColor("#0B3954"), spaceAfter=4),
+                "subtitle": ParagraphStyle("subtitle", parent=base, fontSize=9, alignment=TA_CENTER,
+                                           textColor=colors.HexColor("#666666"), spaceAfter=15),
+                "heading": ParagraphStyle("heading", parent=base, fontName="Helvetica-Bold", fontSize=12, leading=15,
+                                          textColor=colors.HexColor("#0B3954"), spaceBefore=11, spaceAfter=2),
+                "generated": ParagraphStyle("generated", parent=base, fontSize=7.5, alignment=TA_RIGHT,
+                                            textColor=colors.HexColor("#999999"), spaceBefore=30),
+            }
+        return self._reportlab_styles
+
+
+# ---------------- PDF cache ----------------
+class PDFCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, cache_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._disk = OrderedDict()  # key -> file size, least recently used first
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _scan_disk(self):
+        # Rebuild the disk LRU from file mtimes (touched on every hit), then trim to the cap
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        with self._lock:
+            for _, key, size in sorted(files):
+                self._disk[key] = size
+                self._disk_size += size
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def _evict_disk(self):
+        # Caller holds self._lock; returns the keys whose files must be deleted
+        evicted = []
+        while self._disk_size > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)  # mtime marks recent use, so LRU order survives a restart
+        except OSError:
+            # Missing (evicted by another worker sharing the directory) or unreadable
+            with self._lock:
+                size = self._disk.pop(key, None)
+                if size is not None:
+                    self._disk_size -= size
+            return None
+        with self._lock:
+            if key not in self._disk:
+                self._disk_size += len(pdf)
+            self._disk[key] = len(pdf)
+            self._disk.move_to_end(key)
+        return pdf
+
+    def get(self, key):
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf
+        pdf = self._read_disk(key) if self.cache_dir else None
+        if pdf is not None:
+            self._remember(key, pdf)
+            with self._lock:
+                self.hits += 1
+            return pdf
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, pdf):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = pdf
+            self._size += len(pdf)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def put(self, key, pdf):
+        self._remember(key, pdf)
+        if self.cache_dir and len(pdf) <= self.max_disk_bytes:
+            tmp_path = self._disk_path(key) + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(pdf)
+                os.replace(tmp_path, self._disk_path(key))
+            except OSError as e:
+                # Disk full / read-only cache dir: the render still succeeded, it just isn't persisted
+                print(f"⚠️ PDF cache: could not write {key} to disk: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            with self._lock:
+                self._disk_size += len(pdf) - self._disk.pop(key, 0)
+                self._disk[key] = len(pdf)
+                evicted = self._evict_disk()
+            self._remove_files(evicted)
+
+    def stats(self):
+        with self._lock:
+            stats = {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                     "hits": self.hits, "misses": self.misses, "disk": bool(self.cache_dir)}
+            if self.cache_dir:
+                stats.update(disk_entries=len(self._disk), disk_bytes=self._disk_size,
+                             max_disk_bytes=self.max_disk_bytes)
+            return stats
+
+
+# ---------------- ReportLab backend ----------------
+def _logo_flowable(reader, size):
+    from reportlab.platypus import Flowable
+
+    class _Logo(Flowable):
+        # Draws the pre-decoded logo; platypus Image would re-read and decode the PNG for every report
+        def wrap(self, available_width, available_height):
+            return size, size
+
+        def draw(self):
+            self.canv.drawImage(reader, 0, 0, size, size, mask="auto")
+
+    logo = _Logo()
+    logo.hAlign = "CENTER"
+    return logo
+
+
+def _boxed(flowables, border, background, width):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+    box = Table([[flowables]], colWidths=[width])
+    box.setStyle(TableStyle([
+        ("BOX", (0, 0), (-1, -1), 0.75, colors.HexColor(border)),
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor(background)),
+        ("LEFTPADDING", (0, 0), (-1, -1), 11),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 11),
+        ("TOPPADDING", (0, 0), (-1, -1), 11),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 11),
+    ]))
+    return box
+
+
+def render_reportlab(sections, assets):
+    # Same sections as REPORT_TEMPLATE, laid out with platypus flowables instead of HTML/CSS
+    from xml.sax.saxutils import escape
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    styles = assets.reportlab_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=cm, rightMargin=cm, topMargin=cm, bottomMargin=cm,
+                            title="Zoonotic Disease AI Report")
+    width = doc.width
+    story = []
+
+    logo = assets.logo_reader()
+    if logo is not None:
+        story += [_logo_flowable(logo, LOGO_DISPLAY_PX * 0.75), Spacer(1, 7.5)]
+    else:
+        story.append(Paragraph("Zoonotic AI", styles["heading"]))
+    story.append(Paragraph("Zoonotic Disease AI Report", styles["title"]))
+    story.append(Paragraph(
+        f"Report ID: {escape(sections['report_id'])} | Generated by AI-based Detection System", styles["subtitle"]
+    ))
+
+    def heading(text):
+        return [Paragraph(text, styles["heading"]),
+                HRFlowable(width="100%", thickness=0.75, color=colors.HexColor("#cccccc"), spaceAfter=8)]
+
+    story += heading("Core Report Details")
+    rows = [[Paragraph("Field", styles["header"]), Paragraph("Value", styles["header"])]]
+    rows += [[Paragraph(escape(label), styles["bold"]), Paragraph(escape(value), styles["body"])]
+             for label, value in sections["rows"]]
+    table = Table(rows, colWidths=[width * 0.3, width * 0.7], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0B3954")),
+        ("GRID", (0, 0), (-1, -1), 0.75, colors.HexColor("#dddddd")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]))
+    story += [table, Spacer(1, 15)]
+
+    story += heading("Suggestions")
+    suggestions = sections["ai_suggestions"] or ["No model-based suggestion available."]
+    bullets = ListFlowable(
+        [ListItem(Paragraph(escape(str(s)), styles["body"]), leftIndent=15) for s in suggestions],
+        bulletType="bullet", start="\u2022", leftIndent=15
+    )
+    story.append(_boxed([Paragraph("AI Based Suggestions:", styles["bold"]), Spacer(1, 4), bullets],
+                        "#0B3954", "#E8F1F2", width))
+    story.append(Spacer(1, 7.5))
+    story.append(_boxed([Paragraph("Health Advice:", styles["bold"]), Spacer(1, 4),
+                         Paragraph(escape(str(sections["llm_suggestion"])).replace("\n", "<br/>"), styles["body"])],
+                        "#0B5439", "#F0FFF0", width))
+    story.append(Paragraph(f"Report generated on {sections['generated_at']}", styles["generated"]))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# ---------------- Renderer ----------------
+PDF_BACKENDS = ("weasyprint", "reportlab")
+
+
+class ReportPDFRenderer:
+    def __init__(self, static_dir, cache=None, backend="weasyprint"):
+        if backend not in PDF_BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{backend}', expected one of {', '.join(PDF_BACKENDS)}")
+        self.assets = ReportAssets(static_dir)
+        self.cache = cache
+        self.backend = backend
+
+    def render_html(self, sections):
+        return self.assets.template().render(logo_uri=self.assets.logo_uri(), **sections)
+
+    def warm_up(self):
+        # Prepare the assets the selected backend needs
+        if self.backend == "reportlab":
+            self.assets.logo_reader()
+            self.assets.reportlab_styles()
+        else:
+            self.assets.logo_uri()
+            self.assets.stylesheet()
+            self.assets.template()
+
+    def render_sections(self, sections):
+        if self.backend == "reportlab":
+            with stage("reportlab"):
+                return render_reportlab(sections, self.assets)
+        from weasyprint import HTML
+        buffer = BytesIO()
+        with stage("html"):
+            html = self.render_html(sections)
+        with stage("weasyprint"):
+            HTML(string=html).write_pdf(target=buffer, stylesheets=[self.assets.stylesheet()])
+        return buffer.getvalue()
+
+    def cache_key(self, report_doc):
+        # The backend is part of the key so switching backends never serves the other's output; so is
+        # the render date, so a cached PDF never shows a "generated on" date from an earlier day
+        rendered_on = datetime.date.today().strftime("%Y%m%d")
+        return f"{report_doc['_id']}_{report_fingerprint(report_doc)}_{self.backend}_{rendered_on}"
+
+    def render(self, report_doc, serialize):
+        # report_doc is the raw Mongo document; serialize is app.serialize_report
+        key = None
+        if self.cache is not None:
+            with stage("pdf_cache"):
+                key = self.cache_key(report_doc)
+                pdf = self.cache.get(key)
+            if pdf is not None:
+                return pdf
+
+        with stage("sections"):
+            sections = build_report_sections(serialize(report_doc))
+        pdf = self.render_sections(sections)
+        if key is not None:
+            self.cache.put(key, pdf)
+        return pdf
@@ -0,0 +1,129 @@
+"""
+Startup helpers: lazy services, background loaders and a startup profile.
+
+Importing app.py only wires things together. Heavy clients are wrapped in
+``LazyService`` and built on first use, slow one-off work (model loading,
+Mongo index creation) runs in ``BackgroundLoader`` threads, and every phase
+is timed in a ``StartupProfile`` that /healthz reports. For an import-time
+breakdown per package run benchmarks/profile_startup.py.
+"""
+import threading
+import time
+
+LOADER_PENDING = "pending"
+LOADER_LOADING = "loading"
+LOADER_READY = "ready"
+LOADER_FAILED = "failed"
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+        self._lock = threading.Lock()
+        self.phases = {}
+
+    def mark(self, name):
+        # Time since the previous mark (sequential startup phases on the importing thread)
+        now = time.perf_counter()
+        with self._lock:
+            self.phases[name] = round((now - self._last) * 1000, 1)
+            self._last = now
+
+    def record(self, name, seconds):
+        # Duration measured elsewhere (background loaders)
+        with self._lock:
+            self.phases[name] = round(seconds * 1000, 1)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "phases_ms": dict(self.phases),
+                "uptime_s": round(time.perf_counter() - self._t0, 1)
+            }
+
+
+class LazyService:
+    # Proxy that builds the wrapped object on first attribute access
+    def __init__(self, name, factory, profile=None):
+        self._name = name
+        self._factory = factory
+        self._profile = profile
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    self._instance = self._factory()
+                    if self._profile is not None:
+                        self._profile.record(f"lazy:{self._name}", time.perf_counter() - start)
+        return self._instance
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+
+class BackgroundLoader:
+    def __init__(self, name, load, profile=None):
+        self.name = name
+        self._load = load
+        self._profile = profile
+        self._thread = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self.state = LOADER_PENDING
+        self.value = None
+        self.error = None
+        self.seconds = None
+
+    def start(self):
+        # Idempotent: a second create_app() in the same process reuses the running load
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self.state = LOADER_LOADING
+            self._thread = threading.Thread(target=self._run, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.value = self._load()
+            self.state = LOADER_READY
+        except Exception as e:
+            self.error = e
+            self.state = LOADER_FAILED
+            print(f"⚠️ Warning: background load of {self.name} failed - {e}")
+        finally:
+            self.seconds = time.perf_counter() - start
+            if self._profile is not None:
+                self._profile.record(f"background:{self.name}", self.seconds)
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.state == LOADER_READY
+
+    def wait(self, timeout=None):
+        # Returns the loaded value, or None if it failed or is still loading after timeout
+        if self._thread is None:
+            return None
+        self._done.wait(timeout)
+        return self.value if self.ready else None
+
+    def status(self):
+        status = {"state": self.state}
+        if self.seconds is not None:
+            status["seconds"] = round(self.seconds, 3)
+        if self.error is not None:
+            status["error"] = str(self.error)
+        return status
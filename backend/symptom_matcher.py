@@ -0,0 +1,183 @@
+"""
+Symptom phrase matcher.
+
+Maps free text ("high temperature and body pain since monday") to model
+feature names in one left-to-right pass over its words. Phrases come from
+FEATURE_NAMES, SYNONYM_MAP and any extra lexicons (JSON files mapping a
+phrase to one feature or a list of features); they are compiled once into
+a word trie. At each word the longest phrase starting there wins ("bite
+wound" beats "bite"), matches do not overlap, and the scan never backs up
+more than the longest phrase, so the cost is linear in the input length.
+
+A phrase directly after a negation word ("no fever", "without cough") is
+skipped. Only that one phrase is negated: "no fever or cough" still
+matches cough, and negations further back ("did not have a fever") are
+not detected.
+
+Phrases in WHOLE_ITEM_ONLY are too generic for free text (a bare "pain"
+would turn "chest pain" into joint pain). They stay out of the trie and
+only map a request item that is exactly that phrase (see normalize).
+
+Used by app.py for every prediction request and by inference.py instead of
+the BioBERT NER pipeline. Throughput: benchmarks/bench_symptom_matcher.py.
+"""
+import json
+import os
+import re
+
+FEATURE_NAMES = [
+    "anxiety", "bite", "muscle pain", "saliva", "hallucination",
+    "seizure", "respiratory distress", "rash", "paralysis", "headache",
+    "bleeding", "hydrophobia", "cold", "fever", "joint pain",
+    "encephalitis", "agitation", "animal contact", "nausea",
+    "confusion", "cough", "vomiting"
+]
+
+SYNONYM_MAP = {
+    "bodyache": "muscle pain", "muscle ache": "muscle pain",
+    "fear of water": "hydrophobia",
+    "breathing": "respiratory distress", "breathing issue": "respiratory distress",
+    "respiratory": "respiratory distress",
+    "dog": "animal contact", "animal": "animal contact",
+    "scratch": "bite", "bite wound": "bite",
+    "pain": "joint pain", "body pain": "joint pain",
+    "chills": "fever", "temperature": "fever",
+    "sore throat": "cough", "throat pain": "cough"
+}
+
+WHOLE_ITEM_ONLY = {"pain"}
+
+NEGATIONS = {"no", "not", "without", "denies", "denied", "never", "negative"}
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicons")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_FEATURES = ""  # trie key holding the features of the phrase ending at a node (words are never empty)
+
+
+def tokenize(text):
+    return _WORD_RE.findall(text.lower())
+
+
+class SymptomMatcher:
+    def __init__(self, features=FEATURE_NAMES, synonyms=SYNONYM_MAP, lexicon_paths=(), skip_unknown=False,
+                 whole_item_only=WHOLE_ITEM_ONLY):
+        # skip_unknown drops phrase targets outside `features` (models trained on a subset) instead of raising
+        self.features = tuple(features)
+        self._known = set(self.features)
+        self.skip_unknown = skip_unknown
+        self.whole_item_only = {" ".join(tokenize(p)) for p in whole_item_only}
+        self._root = {}
+        self._exact = {}  # every phrase, word-joined -> features; used for whole request items
+        self.max_phrase_words = 0
+        self.phrase_count = 0
+        for feature in self.features:
+            self.add(feature, feature)
+        self.add_lexicon(synonyms)
+        for path in lexicon_paths:
+            self.load_lexicon(path)
+
+    # ---------------- Building ----------------
+    def add(self, phrase, features):
+        # features: one feature name or a list of them; later additions replace earlier ones
+        targets = (features,) if isinstance(features, str) else tuple(features)
+        unknown = [f for f in targets if f not in self._known]
+        if unknown and self.skip_unknown:
+            targets = tuple(f for f in targets if f in self._known)
+            if not targets:
+                return
+        elif unknown:
+            raise ValueError(f"Phrase '{phrase}' maps to unknown features {unknown}")
+        words = tokenize(phrase)
+        if not words:
+            raise ValueError(f"Phrase '{phrase}' has no words")
+        key = " ".join(words)
+        self._exact[key] = targets
+        if key in self.whole_item_only:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        if _FEATURES not in node:
+            self.phrase_count += 1
+        node[_FEATURES] = targets
+        self.max_phrase_words = max(self.max_phrase_words, len(words))
+
+    def add_lexicon(self, mapping):
+        for phrase, features in mapping.items():
+            self.add(phrase, features)
+
+    def load_lexicon(self, path):
+        with open(path, encoding="utf-8") as f:
+            self.add_lexicon(json.load(f))
+
+    def phrases(self):
+        # (phrase, features) for every compiled phrase
+        stack = [((), self._root)]
+        while stack:
+            words, node = stack.pop()
+            for word, child in node.items():
+                if word == _FEATURES:
+                    yield " ".join(words), child
+                else:
+                    stack.append((words + (word,), child))
+
+    # ---------------- Matching ----------------
+    def find(self, text):
+        # Non-overlapping leftmost-longest matches: [(first_word, end_word, features)];
+        # a match right after a negation word is dropped
+        words = tokenize(text)
+        root = self._root
+        matches = []
+        i, n = 0, len(words)
+        while i < n:
+            node = root.get(words[i])
+            if node is None:
+                i += 1
+                continue
+            best, best_end = node.get(_FEATURES), i + 1
+            j = i + 1
+            while j < n:
+                node = node.get(words[j])
+                if node is None:
+                    break
+                j += 1
+                if _FEATURES in node:
+                    best, best_end = node[_FEATURES], j
+            if best is None:
+                i += 1
+                continue
+            if i == 0 or words[i - 1] not in NEGATIONS:
+                matches.append((i, best_end, best))
+            i = best_end
+        return matches
+
+    def match(self, text):
+        # Features mentioned in text, in order of first mention
+        found = {}
+        for _, _, features in self.find(text):
+            for feature in features:
+                found[feature] = None
+        return list(found)
+
+    def normalize(self, symptoms):
+        # Parsed request items -> canonical symptom names. An item that is exactly a known phrase
+        # (including WHOLE_ITEM_ONLY ones like "pain") maps directly; otherwise it is matched as free
+        # text. Items that match nothing are kept as-is so rule-based fallbacks for non-feature
+        # symptoms (e.g. "diarrhea") still apply
+        normalized = {}
+        for item in symptoms:
+            exact = self._exact.get(" ".join(tokenize(item)))
+            for symptom in exact or self.match(item) or [item]:
+                normalized[symptom] = None
+        return list(normalized)
+
+
+def lexicon_paths_from_env(value=None):
+    # SYMPTOM_LEXICONS: comma-separated JSON files; default is every *.json in backend/lexicons/
+    value = os.getenv("SYMPTOM_LEXICONS") if value is None else value
+    if value:
+        return [p.strip() for p in value.split(",") if p.strip()]
+    if not os.path.isdir(LEXICON_DIR):
+        return []
+    return [os.path.join(LEXICON_DIR, name) for name in sorted(os.listdir(LEXICON_DIR)) if name.endswith(".json")]
@@ -0,0 +1,269 @@
+"""
+Per-stage latency tracing, Prometheus metrics and a slow-request profiler.
+
+Each request (or background job) runs inside a trace named after its
+endpoint. Code anywhere on that thread can time a piece of work with
+``with stage("model"):``; outside a trace, ``stage`` is a no-op, so library
+modules can use it freely. Durations feed the histograms below and are
+served as Prometheus text from /metrics. The per-request breakdown is also
+returned in a ``Server-Timing`` header.
+
+For slow requests, ``SamplingProfiler`` samples the request thread's stack
+every few milliseconds (stdlib only, via ``sys._current_frames``). Requests
+slower than the threshold leave a folded-stack file that flamegraph.pl or
+speedscope can read.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter as StackCounter, deque
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ---------------- Metrics ----------------
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, *labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    bucket = _labels(self.labelnames, labels, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{bucket} {count}")
+                bucket = _labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REQUESTS = REGISTRY.counter("zoonotic_requests_total", "HTTP requests by endpoint, method and status.",
+                            ("endpoint", "method", "status"))
+REQUEST_SECONDS = REGISTRY.histogram("zoonotic_request_seconds", "HTTP request latency in seconds.",
+                                     ("endpoint", "method"))
+STAGE_SECONDS = REGISTRY.histogram("zoonotic_stage_seconds",
+                                   "Latency of one stage of a request or background job in seconds.",
+                                   ("endpoint", "stage"))
+SLOW_PROFILES = REGISTRY.counter("zoonotic_slow_request_profiles_total",
+                                 "Slow requests whose sampled profile was written.", ("endpoint",))
+
+
+# ---------------- Traces ----------------
+class Trace:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = {}  # stage -> seconds (summed if a stage repeats)
+
+    def record(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(self.endpoint, name, value=seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+_local = threading.local()
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def begin(endpoint):
+    trace = Trace(endpoint)
+    _local.trace = trace
+    return trace
+
+
+def end():
+    trace = current_trace()
+    _local.trace = None
+    return trace
+
+
+@contextmanager
+def trace(endpoint):
+    # For background jobs; restores any trace already active on the thread
+    previous = current_trace()
+    _local.trace = Trace(endpoint)
+    try:
+        yield _local.trace
+    finally:
+        _local.trace = previous
+
+
+@contextmanager
+def stage(name):
+    active = current_trace()
+    if active is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        active.record(name, time.perf_counter() - start)
+
+
+def observe_stage(endpoint, name, seconds):
+    # Durations measured elsewhere (e.g. returned by a worker process)
+    STAGE_SECONDS.observe(endpoint, name, value=seconds)
+
+
+def observe_request(active, method, status):
+    seconds = active.elapsed()
+    REQUESTS.inc(active.endpoint, method, str(status))
+    REQUEST_SECONDS.observe(active.endpoint, method, value=seconds)
+    return seconds
+
+
+# ---------------- Sampling profiler ----------------
+class SamplingProfiler:
+    def __init__(self, slow_seconds, interval=0.005, sample_rate=1.0, output_dir="profiles", keep=50):
+        self.slow_seconds = slow_seconds
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self._targets = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self._written = deque()
+        self._keep = keep
+
+    def start(self):
+        # Starts sampling the calling thread; returns a token for stop(), or None when not sampled
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        ident = threading.get_ident()
+        with self._lock:
+            self._targets[ident] = StackCounter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return ident
+
+    def stop(self, token, endpoint, seconds):
+        if token is None:
+            return None
+        with self._lock:
+            stacks = self._targets.pop(token, None)
+        if not stacks or seconds < self.slow_seconds:
+            return None
+        return self._write(endpoint, seconds, stacks)
+
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    continue
+                frames = sys._current_frames()
+                for ident, stacks in self._targets.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _write(self, endpoint, seconds, stacks):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint.replace('.', '_')}-{int(seconds * 1000)}ms.folded"
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        SLOW_PROFILES.inc(endpoint)
+        self._written.append(path)
+        while len(self._written) > self._keep:
+            try:
+                os.remove(self._written.popleft())
+            except OSError:
+                pass
+        print(f"⚠️ Slow request {endpoint} took {seconds * 1000:.0f} ms; profile written to {path}")
+        return path
@@ -0,0 +1,256 @@
+"""
+Out-of-core training for large symptom datasets.
+
+train_xgboost.py holds the whole CSV in memory, which is fine for the
+bundled 1,200 rows. This trains from CSVs far larger than RAM:
+
+  1. The CSV is read in ``--chunk-rows`` chunks with uint8 symptom columns.
+     Each chunk is bit-packed (22 features -> 3 bytes per row) into a spill
+     directory, labels as uint8 class ids. The label set comes from a
+     label-only pre-pass.
+  2. XGBoost reads the packed chunks through a ``DataIter``. With
+     ``--memory external`` (default) an ``ExtMemQuantileDMatrix`` keeps
+     the quantised pages on disk. ``--memory quantile`` keeps the
+     (1 byte/value) quantised matrix in RAM instead. Either way the raw
+     data is never fully materialised.
+  3. The model is scored chunk-by-chunk on ``--eval-data`` and exported as a
+     model bundle, like train_xgboost.py does.
+
+Peak memory is bounded by the chunk size plus XGBoost's page cache.
+Throughput (rows/s) is reported for every phase.
+
+    python train_streaming.py --data surveillance.csv [--chunk-rows 500000] [--rounds 200]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+TARGET_COL = "label"
+
+DEFAULT_PARAMS = {
+    "objective": "multi:softprob",
+    "eval_metric": "mlogloss",
+    "tree_method": "hist",
+    "learning_rate": 0.1,
+    "max_depth": 6,
+    "max_bin": 2,  # every feature is 0/1: two bins hold all the information
+}
+
+
+def read_columns(path):
+    # Header names exactly as read_chunks' reader sees them (before stripping)
+    return list(pd.read_csv(path, nrows=0, skipinitialspace=True).columns)
+
+
+def read_header(path):
+    columns = [c.strip() for c in read_columns(path)]
+    return [c for c in columns if c != TARGET_COL]
+
+
+def read_chunks(path, feature_names, chunk_rows):
+    # (uint8 features [rows, n_features], label strings) per chunk; int64 columns never exist.
+    # pandas applies dtypes by the raw header names, so the map is keyed by those, not the stripped ones
+    wanted = set(feature_names)
+    dtypes = {c: np.uint8 for c in read_columns(path) if c.strip() in wanted}
+    reader = pd.read_csv(path, chunksize=chunk_rows, dtype=dtypes, skipinitialspace=True)
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk[feature_names].to_numpy(dtype=np.uint8), chunk[TARGET_COL].astype(str).to_numpy()
+
+
+def scan_classes(path, chunk_rows):
+    classes = set()
+    for chunk in pd.read_csv(path, usecols=lambda c: c.strip() == TARGET_COL, chunksize=chunk_rows):
+        classes.update(chunk.iloc[:, 0].astype(str).unique())
+    return sorted(classes)
+
+
+def encode_labels(labels, classes):
+    # Vectorized label -> class id (-1 for labels outside classes); no per-row Python work
+    return pd.Categorical(labels, categories=classes).codes
+
+
+def pack_rows(features):
+    return np.packbits(features, axis=1, bitorder="little")
+
+
+def unpack_rows(packed, n_features):
+    return np.unpackbits(packed, axis=1, count=n_features, bitorder="little")
+
+
+class PackedChunkStore:
+    # Bit-packed spill of a CSV: chunk-NNNNN.npz with "x" (packed features) and "y" (class ids)
+    def __init__(self, directory, n_features):
+        self.directory = directory
+        self.n_features = n_features
+        self.paths = []
+        self.rows = 0
+        self.bytes = 0
+
+    def append(self, features, labels):
+        path = os.path.join(self.directory, f"chunk-{len(self.paths):05d}.npz")
+        np.savez(path, x=pack_rows(features), y=labels)
+        self.paths.append(path)
+        self.rows += len(labels)
+        self.bytes += os.path.getsize(path)
+
+    def load(self, i):
+        with np.load(self.paths[i]) as data:
+            return unpack_rows(data["x"], self.n_features), data["y"]
+
+
+def spill_csv(path, feature_names, classes, chunk_rows, directory):
+    store = PackedChunkStore(directory, len(feature_names))
+    for features, labels in read_chunks(path, feature_names, chunk_rows):
+        ids = encode_labels(labels, classes)
+        unknown = ids < 0
+        if unknown.any():
+            raise ValueError(f"{path}: label '{labels[unknown.argmax()]}' not seen in the class scan")
+        store.append(features, ids.astype(np.uint8))
+    return store
+
+
+def make_iterator(store, cache_prefix):
+    import xgboost as xgb
+
+    class PackedChunkIter(xgb.DataIter):
+        def __init__(self):
+            self._i = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._i == len(store.paths):
+                return False
+            features, labels = store.load(self._i)
+            input_data(data=features, label=labels)
+            self._i += 1
+            return True
+
+        def reset(self):
+            self._i = 0
+
+    return PackedChunkIter()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS; the resource module does not exist on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the symptom model out of core from large CSVs.")
+    parser.add_argument("--data", default="zoonotic_train_large.csv")
+    parser.add_argument("--eval-data", default="zoonotic_test_large.csv")
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--memory", choices=("external", "quantile"), default="external",
+                        help="external: quantised pages on disk; quantile: quantised matrix in RAM")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--params", default="{}", help="JSON overrides for the XGBoost params")
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--spill-dir", help="where packed chunks and page caches go (default: temp dir)")
+    parser.add_argument("--models-dir", default=os.getenv("MODEL_BUNDLE_DIR", "models"))
+    parser.add_argument("--version", help="bundle version (default: UTC timestamp)")
+    parser.add_argument("--no-latest", action="store_true", help="export without pointing LATEST at the bundle")
+    parser.add_argument("--no-save", action="store_true", help="train and evaluate only")
+    args = parser.parse_args()
+
+    import xgboost as xgb
+
+    spill_dir = tempfile.mkdtemp(prefix="xgb-stream-", dir=args.spill_dir)
+    throughput = {}
+    timings = {}
+    try:
+        feature_names = read_header(args.data)
+        started = time.perf_counter()
+        classes = scan_classes(args.data, args.chunk_rows)
+        if len(classes) > 255:
+            raise ValueError(f"{len(classes)} classes do not fit uint8 class ids")
+        store = spill_csv(args.data, feature_names, classes, args.chunk_rows, spill_dir)
+        timings["ingest_s"] = time.perf_counter() - started
+        throughput["ingest_rows_per_s"] = store.rows / timings["ingest_s"]
+        print(f"💡 {store.rows} rows, {len(feature_names)} features, {len(classes)} classes in "
+              f"{len(store.paths)} chunks; packed {store.bytes / 1e6:.1f} MB "
+              f"({throughput['ingest_rows_per_s']:,.0f} rows/s)")
+
+        started = time.perf_counter()
+        iterator = make_iterator(store, os.path.join(spill_dir, "cache") if args.memory == "external" else None)
+        params = {**DEFAULT_PARAMS, **json.loads(args.params), "num_class": len(classes), "nthread": args.n_jobs}
+        if args.memory == "external":
+            dtrain = xgb.ExtMemQuantileDMatrix(iterator, max_bin=params["max_bin"], nthread=args.n_jobs)
+        else:
+            dtrain = xgb.QuantileDMatrix(iterator, max_bin=params["max_bin"], nthread=args.n_jobs)
+        timings["dmatrix_s"] = time.perf_counter() - started
+        throughput["dmatrix_rows_per_s"] = store.rows / timings["dmatrix_s"]
+
+        started = time.perf_counter()
+        booster = xgb.train(params, dtrain, num_boost_round=args.rounds)
+        timings["train_s"] = time.perf_counter() - started
+        throughput["train_rows_per_s"] = store.rows * args.rounds / timings["train_s"]
+        del dtrain
+
+        # Evaluation streams too: one chunk of predictions in memory at a time
+        started = time.perf_counter()
+        correct = evaluated = 0
+        for features, labels in read_chunks(args.eval_data, feature_names, args.chunk_rows):
+            predicted = booster.inplace_predict(features.astype(np.float32)).argmax(axis=1)
+            truth = encode_labels(labels, classes)
+            known = truth >= 0
+            correct += int((predicted[known] == truth[known]).sum())
+            evaluated += int(known.sum())
+        timings["eval_s"] = time.perf_counter() - started
+        throughput["eval_rows_per_s"] = evaluated / timings["eval_s"] if timings["eval_s"] else 0.0
+        accuracy = round(correct / evaluated, 4) if evaluated else None
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    timings = {k: round(v, 3) for k, v in timings.items()}
+    throughput = {k: round(v) for k, v in throughput.items()}
+    print(f"📊 eval accuracy: {accuracy} on {evaluated} rows; peak RSS {peak_rss_mb()} MB")
+    print(f"📊 timings: {json.dumps(timings)}")
+    print(f"📊 rows/s: {json.dumps(throughput)}  (train = rows x rounds / s)")
+
+    if args.no_save:
+        return 0
+
+    from model_bundle import save_bundle
+
+    path = save_bundle(
+        booster,
+        feature_names=feature_names,
+        class_names=classes,
+        models_dir=args.models_dir,
+        metadata={
+            "dataset": os.path.basename(args.data),
+            "rows": int(store.rows),
+            "training": "streaming",
+            "memory": args.memory,
+            "chunk_rows": args.chunk_rows,
+            "rounds": args.rounds,
+            "params": params,
+            "metrics": {"eval_accuracy": accuracy, "eval_rows": evaluated,
+                        "eval_dataset": os.path.basename(args.eval_data)},
+            "timings_s": timings,
+            "rows_per_s": throughput,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        version=args.version,
+        make_latest=not args.no_latest
+    )
+    print(f"✅ Wrote bundle {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
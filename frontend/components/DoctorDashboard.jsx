@@ -1,6 +1,7 @@
 // frontend/components/DoctorDashboard.jsx
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { mergeUsers } from "./mergeUsers";
 import ReportCharts from "./ReportCharts";
 import {
   FaNotesMedical,
@@ -15,17 +16,21 @@ const DoctorDashboard = () => {
   const [usersWithReports, setUsersWithReports] = useState([]);
   const [selectedUser, setSelectedUser] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  // A single useEffect to fetch all data at once
+  // First page on mount; the server pages reports newest-first via next_cursor
   useEffect(() => {
     setLoading(true);
     axios
       .get("http://localhost:5000/reports", { params: { role: "doctor" } })
       .then((res) => {
-        setUsersWithReports(res.data);
+        const users = res.data?.users || [];
+        setUsersWithReports(users);
+        setNextCursor(res.data?.next_cursor || null);
         // Automatically select the first user if data exists
-        if (res.data && res.data.length > 0) {
-          setSelectedUser(res.data[0]);
+        if (users.length > 0) {
+          setSelectedUser(users[0]);
         }
       })
       .catch((err) => {
@@ -36,6 +41,27 @@ const DoctorDashboard = () => {
       });
   }, []);
 
+  const loadMoreReports = () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    axios
+      .get("http://localhost:5000/reports", { params: { role: "doctor", cursor: nextCursor } })
+      .then((res) => {
+        const merged = mergeUsers(usersWithReports, res.data?.users || []);
+        setUsersWithReports(merged);
+        setNextCursor(res.data?.next_cursor || null);
+        if (selectedUser) {
+          setSelectedUser(merged.find((u) => u.user_id === selectedUser.user_id) || selectedUser);
+        }
+      })
+      .catch((err) => {
+        console.error("Failed to fetch more reports:", err);
+      })
+      .finally(() => {
+        setLoadingMore(false);
+      });
+  };
+
   const reports = selectedUser ? selectedUser.reports : [];
 
   const getRiskLevelClass = (level) => {
@@ -74,6 +100,11 @@ const DoctorDashboard = () => {
               ))}
             </ul>
           )}
+          {nextCursor && (
+            <button className="load-more-btn" onClick={loadMoreReports} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more reports"}
+            </button>
+          )}
         </nav>
       </aside>
 
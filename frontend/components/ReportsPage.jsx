@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { mergeUsers } from "./mergeUsers";
 import "./ReportsPage.css"; // Ensure you have the CSS file for styling
 
 const ReportsPage = ({ darkMode }) => {
@@ -7,17 +8,19 @@ const ReportsPage = ({ darkMode }) => {
     // Use a complex object for selectedUser to maintain its reports
     const [selectedUser, setSelectedUser] = useState(null); 
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     // Function to fetch and process reports (SIMPLIFIED and working with grouped backend data)
     const fetchAndProcessReports = async () => {
         setLoading(true);
         try {
-            // Backend is expected to return an array of unique user objects, 
-            // each with a nested 'reports' array.
+            // Backend returns one page: { users: [{ user_id, username, reports }], next_cursor }
             const res = await axios.get(`http://localhost:5000/reports?role=doctor`);
-            const uniqueUsers = res.data; // Use the grouped data directly
+            const uniqueUsers = res.data?.users || []; // Use the grouped data directly
             
             setUsers(uniqueUsers);
+            setNextCursor(res.data?.next_cursor || null);
 
             // Maintain selected user state across refreshes
             if (selectedUser) {
@@ -41,6 +44,28 @@ const ReportsPage = ({ darkMode }) => {
         fetchAndProcessReports();
     }, []); // Run only once on mount
 
+    // --- FUNCTION: Fetch the next page and merge it into the user list ---
+    const loadMoreReports = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const res = await axios.get("http://localhost:5000/reports", {
+                params: { role: "doctor", cursor: nextCursor }
+            });
+            const merged = mergeUsers(users, res.data?.users || []);
+            setUsers(merged);
+            setNextCursor(res.data?.next_cursor || null);
+            if (selectedUser) {
+                setSelectedUser(merged.find(u => u.user_id === selectedUser.user_id) || selectedUser);
+            }
+        } catch (err) {
+            console.error("Error fetching more reports:", err);
+            alert("Failed to fetch more reports. Ensure the Flask server is running and accessible.");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     // --- FUNCTION: Handle Deletion for SELECTED User ---
     const handleClearUserReports = async () => {
         if (!selectedUser || selectedUser.reports.length === 0) return;
@@ -122,6 +147,11 @@ const ReportsPage = ({ darkMode }) => {
                             </button>
                         ))
                     )}
+                    {nextCursor && (
+                        <button onClick={loadMoreReports} disabled={loadingMore} className="user-button">
+                            {loadingMore ? "Loading..." : "Load more reports"}
+                        </button>
+                    )}
                 </div>
 
                 {/* Selected User Reports Panel */}
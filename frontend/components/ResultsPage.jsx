@@ -5,36 +5,39 @@ import "./ResultsPage.css";
 const ResultsPage = ({ darkMode, userId, isDoctor }) => {
   const [reports, setReports] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
 
   // ------------------ Fetch Reports ------------------
-  const fetchReports = async () => {
+  // Pass a cursor to append the next page; without one the list is reloaded from the newest report
+  const fetchReports = async (cursor = null) => {
     // 💡 CORRECTION 1: Handle cases where userId is null but isDoctor is true (or vice versa)
     if (!userId && !isDoctor) return; 
     setLoading(true);
     try {
       const role = isDoctor ? "doctor" : "user";
-      // Construct URL: Doctor uses only role, User uses role and user_id
-      const url = `http://localhost:5000/reports?role=${role}${
-        !isDoctor && userId ? `&user_id=${userId}` : ""
-      }`;
+      // Doctor uses only role, User uses role and user_id
+      const params = { role };
+      if (!isDoctor && userId) params.user_id = userId;
+      if (cursor) params.cursor = cursor;
 
-      const res = await axios.get(url);
+      const res = await axios.get("http://localhost:5000/reports", { params });
 
       let fetchedReports = [];
       if (isDoctor) {
-        // 💡 CORRECTION 2: When isDoctor is true, the server returns an array of USER OBJECTS, 
+        // 💡 CORRECTION 2: When isDoctor is true, the server returns a page of USER OBJECTS, 
         // each containing a 'reports' array. We need to flatten ALL reports from ALL users.
-        if (Array.isArray(res.data)) {
+        if (Array.isArray(res.data?.users)) {
           // Flatten reports from all user objects and sort them by date (latest first)
-          fetchedReports = res.data.flatMap(u => u.reports)
+          fetchedReports = res.data.users.flatMap(u => u.reports)
             .sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
         }
       } else {
-        // User view: server returns the array of reports directly, already sorted.
-        fetchedReports = res.data;
+        // User view: server returns a page of reports, already sorted.
+        fetchedReports = res.data?.reports;
       }
 
-      setReports(fetchedReports || []);
+      setReports(prev => (cursor ? [...prev, ...(fetchedReports || [])] : fetchedReports || []));
+      setNextCursor(res.data?.next_cursor || null);
     } catch (err) {
       console.error("Error fetching reports:", err);
       alert("Failed to fetch reports. Please check the server status.");
@@ -130,7 +133,7 @@ const ResultsPage = ({ darkMode, userId, isDoctor }) => {
         </button>
       </div>
 
-      {loading ? (
+      {loading && reports.length === 0 ? (
         <p>Loading reports...</p>
       ) : reports.length === 0 ? (
         <p>No reports found.</p>
@@ -214,6 +217,15 @@ const ResultsPage = ({ darkMode, userId, isDoctor }) => {
               
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={() => fetchReports(nextCursor)}
+              disabled={loading}
+              className="download-pdf-btn"
+            >
+              Load more reports
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -12,6 +12,19 @@ export default function UploadPage({ darkMode = false }) {
 
   const navigate = useNavigate();
 
+  const pollUploadJob = async (jobId) => {
+    const deadline = Date.now() + 120000;
+    while (Date.now() < deadline) {
+      const res = await axios.get(`http://127.0.0.1:5000/upload/status/${jobId}`);
+      if (res.data.status === "done") return res.data.result;
+      if (res.data.status === "failed") {
+        throw new Error(res.data.error || "Failed to process file.");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+    throw new Error("Processing is taking longer than expected. Check your reports later.");
+  };
+
   const handleUpload = async () => {
     if (!file) {
       setError("Please select a file");
@@ -30,12 +43,17 @@ export default function UploadPage({ darkMode = false }) {
       const res = await axios.post("http://127.0.0.1:5000/upload", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      setReport(res.data);
+      // The server queues OCR and returns a job id; poll until the parsed report is ready.
+      // Re-uploads of an already processed file come back finished straight away.
+      setReport(
+        res.data.status === "done" ? res.data.result : await pollUploadJob(res.data.job_id)
+      );
     } catch (err) {
       console.error(err);
       setError(
         err.response?.data?.error ||
           err.response?.data?.message ||
+          err.message ||
           "Failed to upload file. Try again."
       );
     } finally {
@@ -0,0 +1,14 @@
+// Shared by DoctorDashboard and ReportsPage: merge a page of grouped reports
+// ({ user_id, username, reports }) into the users already loaded
+export const mergeUsers = (existing, incoming) => {
+  const merged = existing.map((u) => ({ ...u, reports: [...u.reports] }));
+  incoming.forEach((user) => {
+    const match = merged.find((u) => u.user_id === user.user_id);
+    if (match) {
+      match.reports.push(...user.reports);
+    } else {
+      merged.push(user);
+    }
+  });
+  return merged;
+};